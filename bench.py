@@ -0,0 +1,300 @@
+"""Load/benchmark harness for the hot paths
+
+By default it starts mock_zoom.py and the service (pointed at the mock) as
+subprocesses, then drives each scenario at each concurrency level:
+
+    python bench.py
+    python bench.py --scenarios recordings --concurrency 1,16,64 --requests 2000
+    python bench.py --json results.json --baseline last.json
+
+Scenarios:
+    recordings     GET /recordings for a pool of logged-in users
+    callback       GET /oauth/callback (login state fetched untimed beforehand)
+    refresh-storm  every access token is revoked on the mock, then uncached
+                   /recordings calls all hit 401 and refresh at once
+
+Each level reports throughput and p50/p95/p99 latency. With --baseline, a
+p95 or throughput more than --tolerance worse than the baseline is flagged
+and the exit status is 1.
+
+The spawned service gets effectively unlimited Zoom rate limits, so the
+numbers measure the service itself. --zoom-rate-limits keeps its real
+limits, which is how login storms and refresh storms behave in production.
+"""
+from datetime import date, timedelta
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+BENCH_CONFIG = {
+    "service_port": 8100,
+    "mock_port": 9100,
+    "startup_timeout": 20.0,
+    "recordings_days": 90,  # Range per /recordings call (three Zoom windows)
+}
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+async def run_level(scenario, client: httpx.AsyncClient, concurrency: int, total: int) -> dict:
+    """Run `total` scenario requests with `concurrency` in flight"""
+    latencies = []
+    errors = 0
+    next_index = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in next_index:
+            try:
+                seconds, ok = await scenario.request(client, index)
+            except httpx.HTTPError:
+                seconds, ok = 0.0, False
+            if ok:
+                latencies.append(seconds)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "elapsed": round(elapsed, 3),
+        "throughput": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+async def timed(send) -> tuple:
+    """(seconds, ok) for one request"""
+    started = time.perf_counter()
+    response = await send
+    return time.perf_counter() - started, response.is_success
+
+async def login(client: httpx.AsyncClient, user_id: str) -> httpx.Response:
+    """Run the OAuth flow for a mock user (the code is the user ID)"""
+    state = await login_state(client)
+    return await client.get("/oauth/callback", params={"code": user_id, "state": state})
+
+async def login_state(client: httpx.AsyncClient) -> str:
+    auth_url = (await client.get("/oauth/login")).json()["auth_url"]
+    return parse_qs(urlsplit(auth_url).query)["state"][0]
+
+class RecordingsScenario:
+    name = "recordings"
+
+    def __init__(self, args):
+        self.users = [f"bench-user-{n}" for n in range(args.users)]
+        self.to_date = date.today()
+        self.from_date = self.to_date - timedelta(days=BENCH_CONFIG["recordings_days"] - 1)
+
+    async def setup(self, client: httpx.AsyncClient, mock: httpx.AsyncClient):
+        for user_id in self.users:
+            (await login(client, user_id)).raise_for_status()
+
+    async def before_level(self, client: httpx.AsyncClient, mock: httpx.AsyncClient):
+        pass
+
+    async def request(self, client: httpx.AsyncClient, index: int) -> tuple:
+        return await timed(client.get("/recordings", params={
+            "user_id": self.users[index % len(self.users)],
+            "from_date": self.from_date.isoformat(),
+            "to_date": self.to_date.isoformat(),
+        }))
+
+class CallbackScenario:
+    name = "callback"
+
+    def __init__(self, args):
+        self.run = 0
+
+    async def setup(self, client: httpx.AsyncClient, mock: httpx.AsyncClient):
+        pass
+
+    async def before_level(self, client: httpx.AsyncClient, mock: httpx.AsyncClient):
+        self.run += 1
+
+    async def request(self, client: httpx.AsyncClient, index: int) -> tuple:
+        state = await login_state(client)
+        return await timed(client.get("/oauth/callback", params={
+            "code": f"bench-callback-{self.run}-{index}", "state": state
+        }))
+
+class RefreshStormScenario(RecordingsScenario):
+    """Concurrent 401s across every user right after their tokens are revoked"""
+
+    name = "refresh-storm"
+
+    def __init__(self, args):
+        super().__init__(args)
+        self.day_offset = 0
+
+    async def before_level(self, client: httpx.AsyncClient, mock: httpx.AsyncClient):
+        (await mock.post("/mock/expire-tokens")).raise_for_status()
+
+    async def request(self, client: httpx.AsyncClient, index: int) -> tuple:
+        # A date never asked for before, so the response cache cannot answer
+        self.day_offset += 1
+        day = (self.to_date - timedelta(days=self.day_offset)).isoformat()
+        return await timed(client.get("/recordings", params={
+            "user_id": self.users[index % len(self.users)], "from_date": day, "to_date": day
+        }))
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (RecordingsScenario, CallbackScenario, RefreshStormScenario)
+}
+
+def spawn(args) -> list:
+    """Start the mock and the service, both bound to localhost"""
+    mock_url = f"http://127.0.0.1:{args.mock_port}"
+    service_url = f"http://127.0.0.1:{args.service_port}"
+    here = os.path.dirname(os.path.abspath(__file__))
+    output = None if args.verbose else subprocess.DEVNULL
+
+    mock_process = subprocess.Popen([
+        sys.executable, os.path.join(here, "mock_zoom.py"),
+        "--port", str(args.mock_port),
+        "--latency-ms", str(args.mock_latency_ms),
+        "--error-429-rate", str(args.mock_429_rate),
+        "--error-401-rate", str(args.mock_401_rate),
+        "--seed", str(args.seed),
+    ], cwd=here, stdout=output, stderr=output)
+
+    env = {
+        **os.environ,
+        "ZOOM_BASE_URL": f"{mock_url}/v2",
+        "ZOOM_AUTH_URL": f"{mock_url}/oauth/authorize",
+        "ZOOM_TOKEN_URL": f"{mock_url}/oauth/token",
+        "ZOOM_REDIRECT_URI": f"{service_url}/oauth/callback",
+        "TOKEN_STORE_BACKEND": "memory",
+    }
+    if not args.zoom_rate_limits:
+        # Measure the service, not the Zoom rate limits it enforces
+        env.update({"ZOOM_GLOBAL_RATE": "100000", "ZOOM_ACCOUNT_RATE": "100000"})
+    service_process = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "zoom:app",
+        "--host", "127.0.0.1", "--port", str(args.service_port), "--log-level", "warning",
+    ], cwd=here, env=env, stdout=output, stderr=output)
+    return [service_process, mock_process]
+
+async def wait_until_up(url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while True:
+            try:
+                await client.get("/")
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{url} did not start within {timeout}s")
+                await asyncio.sleep(0.2)
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """Lines describing levels that regressed against the baseline"""
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["scenario"], result["concurrency"]))
+        if before is None:
+            continue
+        label = f"{result['scenario']} @ {result['concurrency']}"
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {before['throughput']} -> {result['throughput']} req/s")
+    return regressions
+
+def print_table(results: list):
+    columns = ("scenario", "concurrency", "requests", "errors", "throughput", "p50_ms", "p95_ms", "p99_ms")
+    print("  ".join(f"{c:>13}" for c in columns))
+    for result in results:
+        print("  ".join(f"{result[c]:>13}" for c in columns))
+
+async def main(args) -> int:
+    service_url = args.target or f"http://127.0.0.1:{args.service_port}"
+    mock_url = args.mock or f"http://127.0.0.1:{args.mock_port}"
+    processes = [] if args.target else spawn(args)
+    try:
+        await wait_until_up(mock_url, BENCH_CONFIG["startup_timeout"])
+        await wait_until_up(service_url, BENCH_CONFIG["startup_timeout"])
+
+        limits = httpx.Limits(max_connections=max(args.concurrency) * 2)
+        async with httpx.AsyncClient(base_url=service_url, limits=limits, timeout=60.0) as client, \
+                   httpx.AsyncClient(base_url=mock_url) as mock:
+            results = []
+            for name in args.scenarios:
+                scenario = SCENARIOS[name](args)
+                await scenario.setup(client, mock)
+                if args.warmup:
+                    await run_level(scenario, client, min(args.concurrency), args.warmup)
+                for concurrency in args.concurrency:
+                    await scenario.before_level(client, mock)
+                    results.append(await run_level(scenario, client, concurrency, args.requests))
+                    if args.verbose:
+                        print_table(results[-1:])
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the Zoom recordings service against mock_zoom.py")
+    parser.add_argument("--scenarios", type=lambda v: v.split(","), default=list(SCENARIOS),
+                        help=f"comma separated, from {','.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=500, help="requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed requests before each scenario")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--target", help="benchmark an already running service instead of spawning one")
+    parser.add_argument("--mock", help="mock Zoom URL when --target is given")
+    parser.add_argument("--service-port", type=int, default=BENCH_CONFIG["service_port"])
+    parser.add_argument("--mock-port", type=int, default=BENCH_CONFIG["mock_port"])
+    parser.add_argument("--mock-latency-ms", type=float, default=50.0)
+    parser.add_argument("--mock-429-rate", type=float, default=0.0)
+    parser.add_argument("--mock-401-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--zoom-rate-limits", action="store_true",
+                        help="keep the service's real Zoom rate limits instead of lifting them")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed fractional regression")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,310 @@
+"""Local stand-in for the Zoom OAuth and recordings APIs
+
+Point the service at it with:
+
+    ZOOM_BASE_URL=http://127.0.0.1:9100/v2
+    ZOOM_AUTH_URL=http://127.0.0.1:9100/oauth/authorize
+    ZOOM_TOKEN_URL=http://127.0.0.1:9100/oauth/token
+
+The authorization code doubles as the Zoom user ID, so a load test can log
+in any number of distinct users without a browser. Recordings are generated
+deterministically from the user ID and date, so large datasets cost nothing
+to hold and every run sees the same data.
+"""
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import RedirectResponse, JSONResponse
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import secrets
+import time
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("mock_zoom")
+
+# Behaviour of the mock (CLI flags and POST /mock/config override these)
+MOCK_CONFIG = {
+    "latency_ms": float(os.environ.get("MOCK_ZOOM_LATENCY_MS", "50")),  # Added to every call
+    "jitter_ms": float(os.environ.get("MOCK_ZOOM_JITTER_MS", "20")),
+    "meetings_per_day": int(os.environ.get("MOCK_ZOOM_MEETINGS_PER_DAY", "2")),
+    "files_per_meeting": 2,
+    "max_page_size": 300,
+    "token_ttl": int(os.environ.get("MOCK_ZOOM_TOKEN_TTL", "3600")),
+    "error_401_rate": float(os.environ.get("MOCK_ZOOM_401_RATE", "0")),  # Fraction of API calls
+    "error_429_rate": float(os.environ.get("MOCK_ZOOM_429_RATE", "0")),
+    "retry_after": 1,  # Seconds sent with injected 429s
+    "seed": int(os.environ.get("MOCK_ZOOM_SEED", "1234")),
+}
+
+app = FastAPI(title="Mock Zoom API")
+
+class MockZoomState:
+    """Issued tokens and request counters"""
+
+    def __init__(self, config):
+        self.config = config
+        self.random = random.Random(config["seed"])
+        self.access_tokens = {}  # access token -> (user_id, expires_at)
+        self.refresh_tokens = {}  # refresh token -> user_id
+        self.counts = {}
+
+    def count(self, name: str):
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def issue(self, user_id: str) -> dict:
+        """Issue a fresh access/refresh token pair"""
+        access_token = f"at-{secrets.token_hex(16)}"
+        refresh_token = f"rt-{secrets.token_hex(16)}"
+        self.access_tokens[access_token] = (user_id, time.time() + self.config["token_ttl"])
+        self.refresh_tokens[refresh_token] = user_id
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "refresh_token": refresh_token,
+            "expires_in": self.config["token_ttl"],
+            "scope": "user:read recording:read",
+        }
+
+    def expire_access_tokens(self) -> int:
+        """Revoke every access token; refresh tokens stay valid"""
+        expired = len(self.access_tokens)
+        self.access_tokens.clear()
+        return expired
+
+    def reset(self):
+        self.random.seed(self.config["seed"])
+        self.access_tokens.clear()
+        self.refresh_tokens.clear()
+        self.counts.clear()
+
+mock = MockZoomState(MOCK_CONFIG)
+
+async def simulate_latency():
+    """Sleep for the configured latency plus jitter"""
+    delay = MOCK_CONFIG["latency_ms"] + mock.random.uniform(0, MOCK_CONFIG["jitter_ms"])
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+def injected_error() -> Optional[JSONResponse]:
+    """Randomly fail an API call with a 429 or 401"""
+    roll = mock.random.random()
+    if roll < MOCK_CONFIG["error_429_rate"]:
+        mock.count("injected_429")
+        return JSONResponse(
+            status_code=429,
+            content={"code": 429, "message": "You have reached the maximum per-second rate limit for this API."},
+            headers={"Retry-After": str(MOCK_CONFIG["retry_after"])}
+        )
+    if roll < MOCK_CONFIG["error_429_rate"] + MOCK_CONFIG["error_401_rate"]:
+        mock.count("injected_401")
+        return invalid_token()
+    return None
+
+def invalid_token() -> JSONResponse:
+    return JSONResponse(status_code=401, content={"code": 124, "message": "Invalid access token."})
+
+def authenticate(request: Request) -> Optional[str]:
+    """User ID for the request's bearer token, or None"""
+    authorization = request.headers.get("Authorization", "")
+    if not authorization.startswith("Bearer "):
+        return None
+    entry = mock.access_tokens.get(authorization[len("Bearer "):])
+    if entry is None or entry[1] < time.time():
+        return None
+    return entry[0]
+
+def stable_id(*parts) -> str:
+    return hashlib.sha1(":".join(map(str, parts)).encode()).hexdigest()
+
+def synthetic_meeting(request: Request, user_id: str, day: date, index: int) -> dict:
+    """Deterministic recorded meeting number `index` on `day`"""
+    key = stable_id(user_id, day.isoformat(), index)
+    start = datetime(day.year, day.month, day.day, 8 + index % 12, tzinfo=timezone.utc)
+    duration = 15 + int(key[:2], 16) % 90
+    meeting_id = int(key[2:12], 16) % 10**11
+    files = []
+    for n in range(MOCK_CONFIG["files_per_meeting"]):
+        file_id = stable_id(key, n)[:24]
+        audio = n % 2 == 1
+        files.append({
+            "id": file_id,
+            "meeting_id": key[:22] + "==",
+            "recording_start": start.isoformat().replace("+00:00", "Z"),
+            "recording_end": (start + timedelta(minutes=duration)).isoformat().replace("+00:00", "Z"),
+            "file_type": "M4A" if audio else "MP4",
+            "file_extension": "M4A" if audio else "MP4",
+            "file_size": duration * (1_000_000 if audio else 8_000_000),
+            "play_url": f"{request.base_url}rec/play/{file_id}",
+            "download_url": f"{request.base_url}rec/download/{file_id}",
+            "status": "completed",
+            "recording_type": "audio_only" if audio else "shared_screen_with_speaker_view",
+        })
+    return {
+        "uuid": key[:22] + "==",
+        "id": meeting_id,
+        "account_id": f"acct-{user_id}",
+        "host_id": user_id,
+        "topic": f"Meeting {index + 1} on {day.isoformat()}",
+        "type": 2,
+        "start_time": start.isoformat().replace("+00:00", "Z"),
+        "timezone": "UTC",
+        "duration": duration,
+        "total_size": sum(f["file_size"] for f in files),
+        "recording_count": len(files),
+        "share_url": f"{request.base_url}rec/share/{key[:16]}",
+        "recording_files": files,
+    }
+
+@app.get("/oauth/authorize")
+async def authorize(redirect_uri: str, state: Optional[str] = None, user_id: Optional[str] = None):
+    """Skip consent and redirect straight back with a code (the code is the user ID)"""
+    params = {"code": user_id or f"user-{secrets.token_hex(4)}"}
+    if state:
+        params["state"] = state
+    return RedirectResponse(f"{redirect_uri}?{urlencode(params)}")
+
+@app.post("/oauth/token")
+async def token(request: Request):
+    """Authorization code and refresh token grants (refresh tokens rotate)"""
+    await simulate_latency()
+    # Parsed by hand: request.form() would need python-multipart
+    form = dict(parse_qsl((await request.body()).decode()))
+    grant_type = form.get("grant_type")
+    if not request.headers.get("Authorization", "").startswith("Basic "):
+        return JSONResponse(status_code=401, content={"reason": "Invalid client_id or client_secret", "error": "invalid_client"})
+
+    if grant_type == "authorization_code":
+        code = form.get("code")
+        if not code:
+            return JSONResponse(status_code=400, content={"reason": "Invalid authorization code", "error": "invalid_request"})
+        mock.count("token_exchange")
+        return mock.issue(code)
+    elif grant_type == "refresh_token":
+        user_id = mock.refresh_tokens.pop(form.get("refresh_token"), None)
+        if user_id is None:
+            return JSONResponse(status_code=400, content={"reason": "Invalid Token!", "error": "invalid_request"})
+        mock.count("token_refresh")
+        return mock.issue(user_id)
+    return JSONResponse(status_code=400, content={"reason": "Unsupported grant type", "error": "unsupported_grant_type"})
+
+@app.get("/v2/users/me")
+async def users_me(request: Request):
+    await simulate_latency()
+    mock.count("users_me")
+    error = injected_error()
+    if error:
+        return error
+    user_id = authenticate(request)
+    if user_id is None:
+        return invalid_token()
+    return {
+        "id": user_id,
+        "first_name": "Mock",
+        "last_name": user_id,
+        "email": f"{user_id}@example.com",
+        "type": 2,
+        "account_id": f"acct-{user_id}",
+        "timezone": "UTC",
+    }
+
+@app.get("/v2/users/{user_id}/recordings")
+async def user_recordings(request: Request, user_id: str, page_size: int = 30,
+                          next_page_token: str = "", to: Optional[str] = None,
+                          from_date: Optional[str] = Query(None, alias="from")):
+    """Recordings between from and to, newest day first"""
+    await simulate_latency()
+    mock.count("recordings")
+    error = injected_error()
+    if error:
+        return error
+    token_user = authenticate(request)
+    if token_user is None:
+        return invalid_token()
+    if user_id == "me":
+        user_id = token_user
+    elif user_id != token_user:
+        return JSONResponse(status_code=404, content={"code": 1001, "message": "User does not exist."})
+
+    try:
+        to_day = date.fromisoformat(to) if to else date.today()
+        from_day = date.fromisoformat(from_date) if from_date else to_day - timedelta(days=1)
+    except ValueError:
+        return JSONResponse(status_code=400, content={"code": 300, "message": "Invalid date format."})
+    if from_day > to_day:
+        return JSONResponse(status_code=400, content={"code": 300, "message": "From date should be before to date."})
+
+    page_size = max(1, min(page_size, MOCK_CONFIG["max_page_size"]))
+    per_day = MOCK_CONFIG["meetings_per_day"]
+    total = ((to_day - from_day).days + 1) * per_day
+    offset = int(next_page_token) if next_page_token.isdigit() else 0
+    end = min(offset + page_size, total)
+
+    # Only the requested page is generated, however large the range
+    meetings = [
+        synthetic_meeting(request, user_id, to_day - timedelta(days=n // per_day), n % per_day)
+        for n in range(offset, end)
+    ]
+    return {
+        "from": from_day.isoformat(),
+        "to": to_day.isoformat(),
+        "page_count": -(-total // page_size),
+        "page_size": page_size,
+        "total_records": total,
+        "next_page_token": str(end) if end < total else "",
+        "meetings": meetings,
+    }
+
+@app.post("/mock/config")
+async def update_config(request: Request):
+    """Change mock behaviour at runtime (e.g. latency_ms, error_429_rate)"""
+    changes = await request.json()
+    unknown = set(changes) - set(MOCK_CONFIG)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown settings: {sorted(unknown)}")
+    MOCK_CONFIG.update(changes)
+    logger.info(f"Mock config updated: {changes}")
+    return MOCK_CONFIG
+
+@app.post("/mock/expire-tokens")
+async def expire_tokens():
+    """Revoke all access tokens so the next calls 401 and force refreshes"""
+    return {"expired": mock.expire_access_tokens()}
+
+@app.post("/mock/reset")
+async def reset():
+    mock.reset()
+    return {"message": "Mock state reset"}
+
+@app.get("/mock/stats")
+async def stats():
+    return {
+        "access_tokens": len(mock.access_tokens),
+        "refresh_tokens": len(mock.refresh_tokens),
+        "requests": mock.counts,
+    }
+
+if __name__ == "__main__":
+    import uvicorn
+    parser = argparse.ArgumentParser(description="Mock Zoom API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--jitter-ms", type=float)
+    parser.add_argument("--meetings-per-day", type=int)
+    parser.add_argument("--token-ttl", type=int)
+    parser.add_argument("--error-401-rate", type=float)
+    parser.add_argument("--error-429-rate", type=float)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    MOCK_CONFIG.update({
+        key: value for key, value in vars(args).items()
+        if key in MOCK_CONFIG and value is not None
+    })
+    mock.reset()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+import zoom
+
+PAYLOAD = bytes(range(256)) * 4  # 1024 bytes
+
+class FakeUpstream:
+    """Streamed download response serving `data`, optionally cut short"""
+
+    def __init__(self, data: bytes, status_code: int = 206, chunk: int = 64):
+        self.data = data
+        self.status_code = status_code
+        self.chunk = chunk
+
+    async def aiter_bytes(self, chunk_size):
+        for offset in range(0, len(self.data), self.chunk):
+            await asyncio.sleep(0)
+            yield self.data[offset:offset + self.chunk]
+
+    async def aclose(self):
+        pass
+
+class FakeZoom:
+    """Serves ranges of PAYLOAD; `truncate_to` caps the bytes sent per request"""
+
+    def __init__(self, truncate_to=None, fail_from=None):
+        self.truncate_to = truncate_to
+        self.fail_from = fail_from
+        self.ranges = []
+
+    async def open_download(self, access_token, download_url, headers):
+        start, end = 0, len(PAYLOAD) - 1
+        if "range" in headers:
+            start, end = (int(v) for v in headers["range"][len("bytes="):].split("-"))
+        self.ranges.append((start, end))
+        if self.fail_from is not None and start >= self.fail_from:
+            raise zoom.HTTPException(status_code=502, detail="upstream failed")
+        data = PAYLOAD[start:end + 1]
+        if self.truncate_to is not None:
+            data = data[:self.truncate_to]
+        return FakeUpstream(data, 206 if "range" in headers else 200)
+
+@pytest.fixture
+def archiver(tmp_path, monkeypatch):
+    async def call_with_token_refresh(user_id, call):
+        return await call("token")
+
+    monkeypatch.setattr(zoom, "call_with_token_refresh", call_with_token_refresh)
+    return zoom.RecordingArchiver({
+        **zoom.ARCHIVE_CONFIG, "root": str(tmp_path), "part_size": 100, "part_concurrency": 4
+    })
+
+def use_zoom(monkeypatch, fake: FakeZoom) -> FakeZoom:
+    monkeypatch.setattr(zoom, "zoom_api", fake)
+    return fake
+
+MEETING = {"uuid": "meeting"}
+RECORDING_FILE = {"id": "file", "file_extension": "MP4", "file_size": len(PAYLOAD),
+                  "download_url": "https://zoom.example/rec/download/file"}
+
+def archive(archiver, job=None):
+    job = job or zoom.ArchiveJob("job", ["u"], None, None)
+    asyncio.run(archiver.archive_file(job, "u", MEETING, RECORDING_FILE))
+    return job, archiver._target_path("u", MEETING, RECORDING_FILE)
+
+def test_parallel_parts_assemble_the_file(archiver, monkeypatch):
+    fake = use_zoom(monkeypatch, FakeZoom())
+    writing = []
+    write_checkpoint = zoom.RecordingArchiver._write_checkpoint
+
+    def slow_write_checkpoint(path, size, part_size, done):
+        assert not writing, "checkpoint writes overlapped"
+        writing.append(path)
+        time.sleep(0.005)
+        write_checkpoint(path, size, part_size, done)
+        writing.pop()
+
+    monkeypatch.setattr(zoom.RecordingArchiver, "_write_checkpoint", staticmethod(slow_write_checkpoint))
+    job, path = archive(archiver)
+
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert len(fake.ranges) == 11
+    assert job.files_done == 1 and job.bytes_done == len(PAYLOAD)
+    assert not os.path.exists(path + ".part")
+    assert not os.path.exists(path + ".ckpt.json")
+
+def test_truncated_part_is_not_renamed_into_place(archiver, monkeypatch):
+    archiver.config["part_size"] = 10 * len(PAYLOAD)
+    use_zoom(monkeypatch, FakeZoom(truncate_to=400))
+
+    job = zoom.ArchiveJob("job", ["u"], None, None)
+    with pytest.raises(ValueError, match="truncated"):
+        archive(archiver, job)
+    path = archiver._target_path("u", MEETING, RECORDING_FILE)
+    assert not os.path.exists(path)
+    assert os.path.exists(path + ".part")
+    assert job.bytes_done == 0
+
+def test_truncated_parts_fail_the_file(archiver, monkeypatch):
+    use_zoom(monkeypatch, FakeZoom(truncate_to=60))
+
+    with pytest.raises(ValueError, match="truncated"):
+        archive(archiver)
+
+def test_resume_fetches_only_missing_parts(archiver, monkeypatch):
+    use_zoom(monkeypatch, FakeZoom(fail_from=500))
+    with pytest.raises(zoom.HTTPException):
+        archive(archiver)
+
+    path = archiver._target_path("u", MEETING, RECORDING_FILE)
+    with open(path + ".ckpt.json") as f:
+        checkpoint = json.load(f)
+    finished = checkpoint["done"]
+    assert finished and max(finished) < 5
+    assert not os.path.exists(path)
+
+    fake = use_zoom(monkeypatch, FakeZoom())
+    job, path = archive(archiver)
+
+    missing = [i * 100 for i in range(11) if i not in finished]
+    assert sorted(start for start, _ in fake.ranges) == missing
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert job.bytes_done == len(PAYLOAD)
+    assert not os.path.exists(path + ".ckpt.json")
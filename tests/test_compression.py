@@ -0,0 +1,58 @@
+import asyncio
+import zlib
+
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+import zoom
+
+def test_gzip_ndjson_stream_sends_each_line_as_it_is_produced():
+    async def lines():
+        for n in range(3):
+            yield f'{{"n": {n}}}\n'.encode()
+
+    async def app(scope, receive, send):
+        await StreamingResponse(lines(), media_type="application/x-ndjson")(scope, receive, send)
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    headers = {}
+    bodies = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            headers.update(message["headers"])
+        else:
+            bodies.append(decompressor.decompress(message.get("body", b"")))
+
+    async def receive():
+        await asyncio.sleep(10)
+        return {"type": "http.disconnect"}
+
+    middleware = zoom.MediaAwareGZipMiddleware(app, minimum_size=1)
+    scope = {"type": "http", "method": "GET", "path": "/jobs/x/events",
+             "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(middleware(scope, receive, send))
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert bodies[:3] == [b'{"n": 0}\n', b'{"n": 1}\n', b'{"n": 2}\n']
+
+def test_gzipped_json_has_one_vary_and_a_weak_etag():
+    async def app(scope, receive, send):
+        response = zoom.conditional_json(Request(scope), {"n": list(range(1000))}, "no-cache")
+        await response(scope, receive, send)
+
+    headers = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            headers.extend(message["headers"])
+
+    middleware = zoom.MediaAwareGZipMiddleware(app, minimum_size=1)
+    scope = {"type": "http", "method": "GET", "path": "/recordings",
+             "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(middleware(scope, None, send))
+
+    values = dict(headers)
+    assert values[b"content-encoding"] == b"gzip"
+    assert [v for k, v in headers if k == b"vary"] == [b"Accept-Encoding"]
+    assert values[b"etag"].startswith(b'W/"')
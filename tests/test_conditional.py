@@ -0,0 +1,38 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import zoom
+
+@pytest.fixture
+def client(monkeypatch):
+    tokens = zoom.MemoryTokenStore()
+    tokens["u"] = {"access_token": "token", "user_info": {"id": "u", "first_name": "Ann"}}
+    monkeypatch.setattr(zoom, "user_tokens", tokens)
+    return TestClient(zoom.app)
+
+def test_matching_if_none_match_gets_304(client):
+    first = client.get("/user/u")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == zoom.USER_INFO_CACHE_CONTROL
+
+    cached = client.get("/user/u", headers={"if-none-match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert cached.headers["cache-control"] == zoom.USER_INFO_CACHE_CONTROL
+
+    listed = client.get("/user/u", headers={"if-none-match": f'W/"other", {etag.removeprefix("W/")}'})
+    assert listed.status_code == 304
+    assert client.get("/user/u", headers={"if-none-match": "*"}).status_code == 304
+
+def test_etag_is_stable_until_the_content_changes(client):
+    etag = client.get("/user/u").headers["etag"]
+    assert client.get("/user/u").headers["etag"] == etag
+    assert client.get("/user/u", headers={"accept-encoding": "gzip"}).headers["etag"] == etag
+
+    zoom.user_tokens["u"] = {**zoom.user_tokens["u"], "user_info": {"id": "u", "first_name": "Bo"}}
+    changed = client.get("/user/u", headers={"if-none-match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["user_info"]["first_name"] == "Bo"
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+import zoom
+
+class FakeUpstream:
+    status_code = 200
+
+    def __init__(self):
+        self.closed = False
+
+    async def aiter_bytes(self, chunk_size):
+        for _ in range(3):
+            yield b"x" * chunk_size
+
+    async def aclose(self):
+        self.closed = True
+
+SCOPE = {"type": "http", "method": "GET", "path": "/recordings/m/files/f", "headers": []}
+
+async def receive():
+    await asyncio.sleep(10)
+    return {"type": "http.disconnect"}
+
+def test_upstream_is_closed_after_a_full_send():
+    upstream = FakeUpstream()
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(zoom.UpstreamStreamingResponse(upstream, 4)(SCOPE, receive, send))
+    assert b"".join(m.get("body", b"") for m in sent[1:]) == b"x" * 12
+    assert upstream.closed
+
+def test_upstream_is_closed_when_sending_headers_fails():
+    upstream = FakeUpstream()
+
+    async def send(message):
+        raise OSError("client went away")
+
+    with pytest.raises(OSError):
+        asyncio.run(zoom.UpstreamStreamingResponse(upstream, 4)(SCOPE, receive, send))
+    assert upstream.closed
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+import zoom
+
+def stored_job(status: str, updated_at: float, **fields) -> dict:
+    job = zoom.Job("recordings_history", {"user_id": "u"})
+    return {**job.to_dict(), "status": status, "updated_at": updated_at, **fields}
+
+def job_queue(store=None, coordinator=None) -> zoom.JobQueue:
+    return zoom.JobQueue(zoom.JOB_CONFIG, store or zoom.MemoryTokenStore(),
+                         coordinator or zoom.WorkerCoordinator(zoom.WORKER_CONFIG))
+
+def test_unsaved_job_from_a_dead_worker_is_failed():
+    queue = job_queue()
+    stale = stored_job("running", time.time() - zoom.JOB_CONFIG["orphan_after"] - 1)
+    fresh = stored_job("running", time.time())
+    queue.store[stale["job_id"]] = stale
+    queue.store[fresh["job_id"]] = fresh
+
+    info = queue.get(stale["job_id"])
+    assert info["status"] == "failed" and info["expires_at"] is not None
+    assert queue.store[stale["job_id"]]["status"] == "failed"
+    assert queue.get(fresh["job_id"])["status"] == "running"
+
+def test_lone_worker_fails_unfinished_jobs_on_start(monkeypatch):
+    monkeypatch.setitem(zoom.WORKER_CONFIG, "workers", 1)
+    queue = job_queue()
+    queued = stored_job("queued", time.time())
+    queue.store[queued["job_id"]] = queued
+
+    async def start_and_stop():
+        queue.start()
+        await queue.stop()
+
+    asyncio.run(start_and_stop())
+    assert queue.store[queued["job_id"]]["status"] == "failed"
+
+def test_result_fields_only_project_meetings(monkeypatch):
+    queue = job_queue()
+    monkeypatch.setattr(zoom, "job_queue", queue)
+    export = stored_job("completed", time.time(), finished_at=time.time(),
+                        expires_at=time.time() + 60)
+    history = stored_job("completed", time.time(), finished_at=time.time(),
+                         expires_at=time.time() + 60)
+    queue.store[export["job_id"]] = export
+    queue.store[f"{export['job_id']}/result"] = {"users": [{"user_id": "u", "meetings_total": 2}]}
+    queue.store[history["job_id"]] = history
+    queue.store[f"{history['job_id']}/result"] = {
+        "meetings": [{"topic": "Standup", "duration": 30}]
+    }
+
+    client = TestClient(zoom.app)
+    assert client.get(f"/jobs/{export['job_id']}/result?fields=topic").json() == {
+        "users": [{"user_id": "u", "meetings_total": 2}]
+    }
+    assert client.get(f"/jobs/{history['job_id']}/result?fields=topic").json() == {
+        "meetings": [{"topic": "Standup"}]
+    }
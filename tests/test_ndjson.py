@@ -0,0 +1,23 @@
+import asyncio
+import json
+
+import zoom
+
+def collect(items) -> list:
+    async def run():
+        return [json.loads(line) async for line in zoom.ndjson_lines(items)]
+    return asyncio.run(run())
+
+def test_unexpected_error_is_reported_in_band():
+    async def items():
+        yield {"n": 1}
+        raise KeyError("recording_files")
+
+    assert collect(items()) == [{"n": 1}, {"error": "'recording_files'", "status_code": 500}]
+
+def test_http_error_keeps_its_status():
+    async def items():
+        yield {"n": 1}
+        raise zoom.HTTPException(status_code=429, detail="Rate limited")
+
+    assert collect(items()) == [{"n": 1}, {"error": "Rate limited", "status_code": 429}]
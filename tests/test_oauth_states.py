@@ -0,0 +1,83 @@
+import asyncio
+
+import zoom
+
+def state_store(tmp_path, **config):
+    db = zoom.SQLiteDatabase(str(tmp_path / "tokens.db"))
+    coordinator = zoom.WorkerCoordinator(zoom.WORKER_CONFIG)
+    backend = zoom.SQLiteTokenStore(db, "oauth_states", zoom.TOKEN_STORE_CONFIG, coordinator,
+                                    expires_at=lambda expires_at: expires_at)
+    return zoom.OAuthStateStore(backend, {**zoom.OAUTH_STATE_CONFIG, **config})
+
+def stored_states(tmp_path) -> set:
+    db = zoom.SQLiteDatabase(str(tmp_path / "tokens.db"))
+    return {row[0] for row in db.execute("SELECT key FROM kv WHERE namespace = 'oauth_states'")}
+
+def test_state_is_consumed_once():
+    states = zoom.OAuthStateStore(zoom.MemoryTokenStore(), zoom.OAUTH_STATE_CONFIG)
+    states.add("s")
+    assert states.consume("s")
+    assert not states.consume("s")
+    assert not states.consume("never-issued")
+    assert states.stats()["rejected"] == 2
+
+def test_expired_state_is_rejected(monkeypatch):
+    states = zoom.OAuthStateStore(zoom.MemoryTokenStore(), {**zoom.OAUTH_STATE_CONFIG, "ttl": 10.0})
+    now = 1000.0
+    monkeypatch.setattr(zoom.time, "time", lambda: now)
+    states.add("old")
+    now += 5
+    states.add("new")
+    now += 6
+    assert not states.consume("old")
+    assert states.consume("new")
+    assert states.stats()["expired"] == 1
+
+def test_cap_evicts_oldest_state():
+    states = zoom.OAuthStateStore(zoom.MemoryTokenStore(), {**zoom.OAUTH_STATE_CONFIG, "max_entries": 3})
+    for n in range(5):
+        states.add(f"s{n}")
+    assert len(states) == 3
+    assert not states.consume("s0")
+    assert not states.consume("s1")
+    assert states.consume("s4")
+    assert states.stats()["evicted"] == 2
+
+def test_purge_removes_expired_states_issued_elsewhere(tmp_path, monkeypatch):
+    other = state_store(tmp_path, ttl=10.0, purge_interval=float("inf"))
+    states = state_store(tmp_path, ttl=10.0, purge_interval=float("inf"))
+    now = 1000.0
+    monkeypatch.setattr(zoom.time, "time", lambda: now)
+
+    async def scenario():
+        nonlocal now
+        # Issued by a worker that then went away without sweeping them
+        for n in range(5):
+            other.add(f"orphan-{n}")
+        await other.flush()
+        now += 20
+        states.add("live")
+        await states.flush()
+        await states.purge()
+
+    asyncio.run(scenario())
+    assert stored_states(tmp_path) == {"live"}
+    assert states.stats()["purged"] == 5
+
+def test_purge_enforces_cap_across_workers(tmp_path, monkeypatch):
+    workers = [state_store(tmp_path, max_entries=4, purge_interval=3600.0) for _ in range(3)]
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(zoom.time, "time", lambda: next(clock))
+
+    async def scenario():
+        for n in range(3):
+            for i, states in enumerate(workers):
+                states.add(f"w{i}-{n}")
+        for states in workers:
+            await states.flush()
+        await workers[0].purge()
+
+    asyncio.run(scenario())
+    # The states closest to expiring go first, whichever worker issued them
+    assert stored_states(tmp_path) == {"w2-1", "w0-2", "w1-2", "w2-2"}
+    assert len(workers[0]) <= 4
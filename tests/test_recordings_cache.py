@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+import zoom
+
+PAGES = 5
+
+def paged_zoom(monkeypatch):
+    cache = zoom.ResponseCache(zoom.RESPONSE_CACHE_CONFIG, zoom.WorkerCoordinator(zoom.WORKER_CONFIG))
+    fetched = []
+
+    async def fetch(access_token, user_id, from_date, to_date, page_size, next_page_token):
+        page = int(next_page_token or 0)
+        fetched.append(page)
+        return {
+            "meetings": [{"uuid": f"{from_date}-{page}"}],
+            "next_page_token": str(page + 1) if page + 1 < PAGES else "",
+        }
+
+    monkeypatch.setattr(zoom.zoom_api, "cache", cache)
+    monkeypatch.setattr(zoom.zoom_api, "_fetch_user_recordings", fetch)
+    return cache, fetched
+
+def walk(**kwargs) -> list:
+    async def collect():
+        return [m async for m in zoom.zoom_api.iter_user_recordings("token", "u", **kwargs)]
+    return asyncio.run(collect())
+
+def test_page_walk_caches_only_the_first_page(monkeypatch):
+    cache, fetched = paged_zoom(monkeypatch)
+
+    assert len(walk(from_date="2024-01-01")) == PAGES
+    assert len(cache._entries) == 1
+
+    walk(from_date="2024-01-01")
+    assert fetched.count(0) == 1 and len(fetched) == 2 * PAGES - 1
+
+def test_uncached_walk_leaves_the_cache_empty(monkeypatch):
+    cache, _ = paged_zoom(monkeypatch)
+
+    assert len(walk(from_date="2024-01-01", use_cache=False)) == PAGES
+    assert len(cache._entries) == 0
+
+def fetch_all(monkeypatch, from_date, to_date) -> dict:
+    async def call_with_token_refresh(user_id, call):
+        return await call("token")
+
+    monkeypatch.setattr(zoom, "call_with_token_refresh", call_with_token_refresh)
+    return asyncio.run(zoom.fetch_user_recordings("u", from_date, to_date))
+
+def test_single_window_range_returns_every_page(monkeypatch):
+    _, fetched = paged_zoom(monkeypatch)
+
+    recordings = fetch_all(monkeypatch, "2024-01-01", "2024-01-10")
+    assert len(recordings["meetings"]) == PAGES
+    assert recordings["next_page_token"] == ""
+    assert sorted(fetched) == list(range(PAGES))
+
+def test_range_longer_than_the_maximum_is_rejected(monkeypatch):
+    _, fetched = paged_zoom(monkeypatch)
+
+    with pytest.raises(zoom.HTTPException) as error:
+        fetch_all(monkeypatch, "1900-01-01", "2024-01-01")
+    assert error.value.status_code == 400
+    assert fetched == []
@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+import zoom
+
+class Ok:
+    status_code = 200
+    headers = {}
+
+def scheduler() -> zoom.OutboundScheduler:
+    return zoom.OutboundScheduler({
+        **zoom.OUTBOUND_RATE_CONFIG,
+        "global_rate": 1000.0, "global_burst": 1000,
+        "account_rate": 1.0, "account_burst": 2,
+        "default_deadline": 1.0,
+    })
+
+async def send_many(outbound: zoom.OutboundScheduler, account, count: int) -> list:
+    async def ok():
+        return Ok()
+    try:
+        return await asyncio.gather(
+            *(outbound.send(account, ok) for _ in range(count)), return_exceptions=True
+        )
+    finally:
+        await outbound.stop()
+
+def test_oauth_calls_skip_the_account_bucket():
+    started = time.monotonic()
+    results = asyncio.run(send_many(scheduler(), None, 50))
+    assert all(isinstance(r, Ok) for r in results)
+    assert time.monotonic() - started < 0.5
+
+def test_account_calls_are_still_limited():
+    results = asyncio.run(send_many(scheduler(), "user", 5))
+    assert sum(isinstance(r, Ok) for r in results) < 5
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+import zoom
+
+def test_concurrent_identical_calls_share_one_run():
+    flights = zoom.SingleFlight()
+    runs = []
+
+    async def fetch():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return {"meetings": []}
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do(("recordings", "u"), fetch) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+    assert len(runs) == 1
+    assert all(result is results[0] for result in results)
+    assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 9}
+
+def test_different_keys_and_later_calls_run_again():
+    flights = zoom.SingleFlight()
+    runs = []
+
+    async def fetch(key):
+        runs.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    async def scenario():
+        await asyncio.gather(flights.do(("a",), lambda: fetch("a")), flights.do(("b",), lambda: fetch("b")))
+        await flights.do(("a",), lambda: fetch("a"))
+
+    asyncio.run(scenario())
+    assert sorted(runs) == ["a", "a", "b"]
+
+def test_every_waiter_gets_the_shared_exception():
+    flights = zoom.SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise zoom.HTTPException(status_code=429, detail="Rate limited")
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do(("k",), fetch) for _ in range(5)), return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert all(isinstance(e, zoom.HTTPException) and e.status_code == 429 for e in errors)
+    assert flights.stats()["in_flight"] == 0
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flights = zoom.SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        first = asyncio.create_task(flights.do(("k",), fetch))
+        second = asyncio.create_task(flights.do(("k",), fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
@@ -0,0 +1,32 @@
+import json
+
+import zoom
+
+PAGE = zoom.HTMLTemplate(
+    "<p title=\"{{html:name}}\">{{html:name}}</p>"
+    "<script>var user = '{{js:name}}';</script>"
+    "<a href=\"/next?user={{url:name}}\">next</a>"
+)
+
+def test_each_placeholder_is_escaped_for_its_context():
+    name = "</script><b onclick=\"x\">'&"
+    page = PAGE.render(name=name)
+
+    assert "<p title=\"&lt;/script&gt;&lt;b onclick=&quot;x&quot;&gt;&#x27;&amp;\">" in page
+    assert "var user = '\\u003c/script\\u003e\\u003cb onclick=\\\"x\\\"\\u003e\\u0027\\u0026';" in page
+    assert "/next?user=%3C%2Fscript%3E%3Cb%20onclick%3D%22x%22%3E%27%26" in page
+    assert page.count("</script>") == 1
+
+def test_js_escape_round_trips_through_a_js_string_literal():
+    for value in ["plain", "back\\slash", "quote'\"", "line\nbreak", "sep\u2028\u2029", "</script>", "é"]:
+        escaped = zoom.escape_js_string(value)
+        assert "<" not in escaped and "'" not in escaped and "\u2028" not in escaped
+        # What a browser's JS parser yields is what JSON yields for these escapes
+        assert json.loads('"' + escaped + '"') == value
+
+def test_bound_template_is_static_with_a_stable_etag():
+    bound = PAGE.bind(name="Ann")
+    assert bound.body == PAGE.render(name="Ann").encode()
+    assert bound.etag == PAGE.bind(name="Ann").etag
+    assert bound.etag != PAGE.bind(name="Bob").etag
+    assert PAGE.body is None and PAGE.etag is None
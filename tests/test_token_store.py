@@ -0,0 +1,80 @@
+import asyncio
+
+import zoom
+
+def sqlite_store(tmp_path, **config):
+    db = zoom.SQLiteDatabase(str(tmp_path / "tokens.db"))
+    coordinator = zoom.WorkerCoordinator(zoom.WORKER_CONFIG)
+    store = zoom.SQLiteTokenStore(db, "user_tokens", {**zoom.TOKEN_STORE_CONFIG, **config}, coordinator)
+    return db, store
+
+def stored_keys(db) -> set:
+    return {row[0] for row in db.execute("SELECT key FROM kv WHERE namespace = 'user_tokens'")}
+
+def test_write_during_flush_is_not_lost(tmp_path):
+    db, store = sqlite_store(tmp_path, flush_interval=0.01)
+
+    async def scenario():
+        store["a"] = {"access_token": "A"}
+        flushing = asyncio.create_task(store.flush())
+        await asyncio.sleep(0)
+        store["b"] = {"access_token": "B"}
+        await flushing
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert stored_keys(db) == {"a", "b"}
+    assert store._dirty == {}
+
+def test_deleted_keys_leave_nothing_cached(tmp_path):
+    db, store = sqlite_store(tmp_path)
+
+    async def scenario():
+        for n in range(500):
+            store[f"state-{n}"] = {"n": n}
+            await asyncio.sleep(0)
+            del store[f"state-{n}"]
+        await store.flush()
+
+    asyncio.run(scenario())
+    assert stored_keys(db) == set()
+    assert len(store) == 0
+    assert len(store._cache) == 0
+
+def test_read_cache_is_bounded(tmp_path):
+    db, store = sqlite_store(tmp_path, cache_entries=10)
+    for n in range(50):
+        store.get(f"missing-{n}")
+    assert len(store._cache) == 10
+
+def test_len_and_iter_do_not_rescan(tmp_path, monkeypatch):
+    db, store = sqlite_store(tmp_path)
+    for n in range(5):
+        store[f"user-{n}"] = {"n": n}
+    reads = []
+    read = db.read
+    monkeypatch.setattr(db, "read", lambda sql, params=(): reads.append(sql) or read(sql, params))
+
+    assert len(store) == 5
+    assert sorted(store) == [f"user-{n}" for n in range(5)]
+    del store["user-0"]
+    assert len(store) == 4
+    assert len(reads) == 1
+
+def test_keys_changed_by_another_worker_are_rechecked(tmp_path):
+    db, store = sqlite_store(tmp_path)
+    _, other = sqlite_store(tmp_path)
+    store["mine"] = {"n": 1}
+    assert len(store) == 1
+
+    async def scenario():
+        other["theirs"] = {"n": 2}
+        del other["mine"]
+        await other.flush()
+        # What the invalidation poll delivers for the other worker's writes
+        store.invalidate("theirs")
+        store.invalidate("mine")
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert sorted(store) == ["theirs"]
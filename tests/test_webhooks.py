@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import zoom
+
+def recording_file(file_id: str, size: int) -> dict:
+    return {"id": file_id, "file_type": "MP4", "file_size": size}
+
+MEETING = {
+    "uuid": "m1==", "id": 1, "host_id": "u", "topic": "Standup",
+    "start_time": "2024-01-02T09:00:00Z", "duration": 30,
+    "total_size": 300, "recording_count": 2,
+    "recording_files": [recording_file("f1", 100), recording_file("f2", 200)],
+}
+
+def event(kind: str, meeting: dict) -> dict:
+    return {"event": kind, "payload": {"object": meeting}}
+
+def consumer(tmp_path):
+    index = zoom.RecordingsIndex({**zoom.RECORDINGS_INDEX_CONFIG, "sqlite_path": str(tmp_path / "index.db")})
+    cache = zoom.ResponseCache(zoom.RESPONSE_CACHE_CONFIG, zoom.WorkerCoordinator(zoom.WORKER_CONFIG))
+    return index, zoom.WebhookConsumer(zoom.WEBHOOK_CONFIG, index, cache)
+
+def indexed(index) -> dict:
+    result = asyncio.run(index.query("u"))
+    return {m["uuid"]: m for m in result["meetings"]}
+
+def test_rename_updates_only_the_topic(tmp_path):
+    index, webhooks = consumer(tmp_path)
+    asyncio.run(webhooks.apply([event("recording.completed", MEETING)]))
+
+    header = {key: MEETING[key] for key in ("uuid", "id", "host_id", "start_time", "duration")}
+    asyncio.run(webhooks.apply([event("recording.renamed", {**header, "topic": "Retro"})]))
+
+    meeting = indexed(index)["m1=="]
+    assert meeting["topic"] == "Retro"
+    assert meeting["recording_count"] == 2 and meeting["total_size"] == 300
+    assert len(meeting["recording_files"]) == 2
+
+def test_trashing_one_file_keeps_the_meeting(tmp_path):
+    index, webhooks = consumer(tmp_path)
+    asyncio.run(webhooks.apply([event("recording.completed", MEETING)]))
+
+    trashed = {**MEETING, "recording_files": [recording_file("f1", 100)]}
+    asyncio.run(webhooks.apply([event("recording.trashed", trashed)]))
+
+    meeting = indexed(index)["m1=="]
+    assert [f["id"] for f in meeting["recording_files"]] == ["f2"]
+    assert meeting["recording_count"] == 1 and meeting["total_size"] == 200
+
+    asyncio.run(webhooks.apply([event("recording.deleted", {**MEETING, "recording_files": [recording_file("f2", 200)]})]))
+    assert indexed(index) == {}
+
+def test_events_in_one_batch_apply_in_order(tmp_path):
+    index, webhooks = consumer(tmp_path)
+    asyncio.run(webhooks.apply([
+        event("recording.completed", MEETING),
+        event("recording.renamed", {"uuid": "m1==", "host_id": "u", "topic": "Retro"}),
+        event("recording.trashed", {**MEETING, "recording_files": [recording_file("f2", 200)]}),
+    ]))
+
+    meeting = indexed(index)["m1=="]
+    assert meeting["topic"] == "Retro"
+    assert [f["id"] for f in meeting["recording_files"]] == ["f1"]
+
+SECRET = "webhook-secret"
+
+def signed_post(client, body: bytes, timestamp=None, signature=None):
+    timestamp = str(int(time.time())) if timestamp is None else timestamp
+    if signature is None:
+        signature = "v0=" + hmac.new(SECRET.encode(), b"v0:" + timestamp.encode() + b":" + body,
+                                     hashlib.sha256).hexdigest()
+    return client.post("/webhooks/zoom", content=body, headers={
+        "content-type": "application/json",
+        "x-zm-request-timestamp": timestamp,
+        "x-zm-signature": signature,
+    })
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(zoom.ZOOM_CONFIG, "webhook_secret_token", SECRET)
+    return TestClient(zoom.app)
+
+def test_url_validation_returns_the_signed_token(client):
+    body = json.dumps({"event": "endpoint.url_validation", "payload": {"plainToken": "abc"}}).encode()
+    response = signed_post(client, body)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "plainToken": "abc",
+        "encryptedToken": hmac.new(SECRET.encode(), b"abc", hashlib.sha256).hexdigest(),
+    }
+
+def test_bad_signature_is_unauthorized(client):
+    body = b'{"event": "meeting.started"}'
+    assert signed_post(client, body, signature="v0=" + "0" * 64).status_code == 401
+    assert signed_post(client, body, signature="v0=été".encode()).status_code == 401
+
+def test_stale_or_malformed_timestamp_is_unauthorized(client):
+    body = b'{"event": "meeting.started"}'
+    stale = str(int(time.time()) - zoom.WEBHOOK_CONFIG["max_clock_skew"] - 60)
+    assert signed_post(client, body, timestamp=stale).status_code == 401
+    assert signed_post(client, body, timestamp="soon").status_code == 401
+    assert signed_post(client, body).status_code == 200
+
+def test_signed_body_that_is_not_utf8_is_a_bad_request(client):
+    assert signed_post(client, b'{"event": "\xff"}').status_code == 400
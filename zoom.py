@@ -1,20 +1,245 @@
+import time
+_import_started = time.perf_counter()  # Taken before the framework imports for startup profiling
+
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, JSONResponse
-import httpx
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from pydantic import BaseModel
+from fastapi.responses import RedirectResponse, JSONResponse, StreamingResponse, HTMLResponse, Response, PlainTextResponse
+import asyncio
 import base64
+import bisect
 from urllib.parse import urlencode, parse_qs
 import secrets
-from typing import Optional
+import uuid
+from typing import List, Optional
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, quote
+import importlib.util
+import hashlib
+import heapq
+import hmac
+import html
+import itertools
 import json
 import logging
+import os
+import random
+import re
+import sqlite3
+import threading
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Zoom Recordings API")
+# Cold start: heavy setup waits for first use unless LAZY_START=0
+STARTUP_CONFIG = {
+    "lazy": os.environ.get("LAZY_START", "1") == "1",
+}
+
+class StartupProfile:
+    """Import time, startup time, first request and per-component start costs
+
+    Each component is timed the first time it starts, so in lazy mode the
+    profile shows both what it cost and how long after import it was
+    first needed. Times are seconds since the module began importing.
+    """
+
+    def __init__(self, config, import_started: float):
+        self.config = config
+        self.import_started = import_started
+        self.import_seconds: Optional[float] = None
+        self.lifespan_started: Optional[float] = None
+        self.lifespan_seconds: Optional[float] = None
+        self.ready = False
+        self.first_request: Optional[dict] = None
+        self.components = {}  # name -> {"started_at", "start_seconds"}
+        self._deferred = []  # (name, start) run once the first request has a response
+    
+    def since_import(self, moment: float) -> float:
+        return round(moment - self.import_started, 4)
+    
+    def imported(self):
+        """Mark the end of module import"""
+        self.import_seconds = round(time.perf_counter() - self.import_started, 4)
+    
+    def begin(self):
+        """Mark the start of the app lifespan"""
+        self.lifespan_started = time.perf_counter()
+    
+    def finish(self):
+        """Mark startup complete; the app is ready for traffic"""
+        self.lifespan_seconds = round(time.perf_counter() - self.lifespan_started, 4)
+        self.ready = True
+    
+    @contextmanager
+    def timed(self, name: str):
+        """Record how long a component's first start takes"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if name not in self.components:
+                self.components[name] = {
+                    "started_at": self.since_import(started),
+                    "start_seconds": round(time.perf_counter() - started, 4),
+                }
+    
+    def start(self, name: str, start):
+        with self.timed(name):
+            start()
+    
+    def defer(self, name: str, start):
+        """Start a component after the first request is answered (now when not lazy)"""
+        if self.config["lazy"]:
+            self._deferred.append((name, start))
+        else:
+            self.start(name, start)
+    
+    def start_deferred(self):
+        """Start every deferred component"""
+        deferred, self._deferred = self._deferred, []
+        for name, start in deferred:
+            try:
+                self.start(name, start)
+            except Exception as e:
+                logger.error(f"Deferred start of {name} failed: {e}")
+    
+    def stats(self) -> dict:
+        return {
+            "lazy": self.config["lazy"],
+            "ready": self.ready,
+            "import_seconds": self.import_seconds,
+            "lifespan_started_at": self.lifespan_started and self.since_import(self.lifespan_started),
+            "lifespan_seconds": self.lifespan_seconds,
+            "first_request": self.first_request,
+            "components": self.components,
+            "deferred": [name for name, _ in self._deferred],
+        }
+
+startup = StartupProfile(STARTUP_CONFIG, _import_started)
+
+# Optional faster JSON encoder and brotli compression
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Response compression (gzip for everything, brotli for JSON when installed)
+COMPRESSION_CONFIG = {
+    "min_size": 1024,  # Bytes; smaller responses are sent uncompressed
+    "gzip_level": 6,
+    "brotli_quality": 4,
+}
+
+def dumps_json(payload) -> bytes:
+    """Encode JSON with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+
+class FastJSONResponse(JSONResponse):
+    """Default response class using the fastest available JSON encoder"""
+
+    def render(self, content) -> bytes:
+        return dumps_json(content)
+
+class FlushingGZipResponder(GZipResponder):
+    """GZip that sync-flushes after every streamed chunk
+
+    Starlette's responder only emits compressed bytes once its buffer
+    fills, which holds NDJSON lines and heartbeats back until the stream
+    ends. A sync flush costs a few bytes per chunk and sends each one now.
+    """
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if more_body:
+            self.gzip_file.write(body)
+            self.gzip_file.flush()
+            body = self.gzip_buffer.getvalue()
+            self.gzip_buffer.seek(0)
+            self.gzip_buffer.truncate()
+            return body
+        return super().apply_compression(body, more_body=more_body)
+
+class MediaAwareGZipMiddleware(GZipMiddleware):
+    """GZip that leaves proxied recording files (already compressed media) alone"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or "/files/" in scope["path"]:
+            await self.app(scope, receive, send)
+            return
+        if "gzip" in Headers(scope=scope).get("accept-encoding", ""):
+            responder = FlushingGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        
+        async def send_with_single_vary(message):
+            # The responder appends Accept-Encoding even when the app already set it
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if "vary" in headers:
+                    values = {v.strip().lower(): v.strip() for v in headers["vary"].split(",")}
+                    headers["Vary"] = ", ".join(values.values())
+            await send(message)
+        
+        await responder(scope, receive, send_with_single_vary)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own process-wide resources for the lifetime of the app
+
+    In lazy mode the HTTP pool and SQLite files open on first use and the
+    background loops start once the first request has its response.
+    """
+    startup.begin()
+    if not STARTUP_CONFIG["lazy"]:
+        http_pool.start()
+    
+    def schedule_restored_tokens():
+        # Tokens restored from a persistent store still need their refreshes scheduled
+        for user_id, token_info in user_tokens.items():
+            token_refresher.schedule(user_id, token_info)
+    
+    startup.defer("worker_coordinator", worker_coordinator.start)
+    startup.defer("token_refresher", token_refresher.start)
+    if RECORDINGS_INDEX_CONFIG["sync_enabled"]:
+        startup.defer("recordings_syncer", recordings_syncer.start)
+    startup.defer("webhook_consumer", webhook_consumer.start)
+    startup.defer("job_queue", job_queue.start)
+    startup.defer("token_schedules", schedule_restored_tokens)
+    startup.finish()
+    try:
+        yield
+    finally:
+        startup.ready = False
+        await job_queue.stop()
+        await token_refresher.stop()
+        await webhook_consumer.stop()
+        await recordings_syncer.stop()
+        await outbound_scheduler.stop()
+        await user_tokens.close()
+        await oauth_states.close()
+        await worker_coordinator.stop()
+        await http_pool.close()
+
+app = FastAPI(
+    title="Zoom Recordings API", lifespan=lifespan,
+    default_response_class=FastJSONResponse
+)
 
 # Add CORS middleware to allow frontend requests
 app.add_middleware(
@@ -25,502 +250,3890 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class MetricsMiddleware:
+    """Records inbound latency per route template (pure ASGI, no body buffering)"""
+
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status = ["500"]
+        
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started, scope["method"],
+                getattr(route, "path", "unmatched"), status[0]
+            )
+
+app.add_middleware(MetricsMiddleware)
+
+class StartupMiddleware:
+    """Times the first request and then starts the deferred components"""
+
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or startup.first_request is not None:
+            await self.app(scope, receive, send)
+            return
+        
+        received = time.perf_counter()
+        startup.first_request = {
+            "path": scope["path"],
+            "received_at": startup.since_import(received),
+            "after_lifespan_seconds": round(
+                received - startup.lifespan_started - startup.lifespan_seconds, 4
+            ) if startup.ready else None,
+        }
+        
+        async def send_first(message):
+            if message["type"] == "http.response.start":
+                startup.first_request["response_seconds"] = round(time.perf_counter() - received, 4)
+                await send(message)
+                startup.start_deferred()
+                return
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_first)
+        finally:
+            startup.start_deferred()
+
+app.add_middleware(StartupMiddleware)
+
+# Compress large responses; streamed NDJSON is flushed line by line
+app.add_middleware(
+    MediaAwareGZipMiddleware,
+    minimum_size=COMPRESSION_CONFIG["min_size"],
+    compresslevel=COMPRESSION_CONFIG["gzip_level"],
+)
+
 # Configuration - Updated to match the authorization URL credentials
 ZOOM_CONFIG = {
     "client_id": "VhQRheNdSwKLc79wBLGJeA", 
     "client_secret": "8WlYOsoHk6zNsociFvETLIHZ8bNR5bVj",  # Make sure this is correct
-    "base_url": "https://api.zoom.us/v2",
-    "redirect_uri": "https://zoombk.onrender.com/oauth/callback"
+    # Overridable so the service can be pointed at mock_zoom.py for load tests
+    "base_url": os.environ.get("ZOOM_BASE_URL", "https://api.zoom.us/v2"),
+    "auth_url": os.environ.get("ZOOM_AUTH_URL", "https://zoom.us/oauth/authorize"),
+    "token_url": os.environ.get("ZOOM_TOKEN_URL", "https://zoom.us/oauth/token"),
+    "redirect_uri": os.environ.get("ZOOM_REDIRECT_URI", "https://zoombk.onrender.com/oauth/callback"),
+    # Secret token from the Zoom app's event subscription (webhooks are rejected without it)
+    "webhook_secret_token": os.environ.get("ZOOM_WEBHOOK_SECRET_TOKEN", "")
 }
 
-# In-memory storage for demonstration (use database in production)
-user_tokens = {}
-oauth_states = {}
+# Shared outbound HTTP client settings (one pooled client per process)
+HTTP_CLIENT_CONFIG = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+    "http2": True,  # Only used when the optional "h2" package is installed
+    "connect_timeout": 5.0,
+    "default_timeout": 10.0,
+    # Read/write/pool timeout per upstream host
+    "host_timeouts": {
+        "api.zoom.us": 15.0,
+        "zoom.us": 10.0,
+    },
+}
+
+# Zoom rejects recordings requests with a page_size above this
+ZOOM_MAX_PAGE_SIZE = 300
+
+# Long /recordings date ranges are split into Zoom-sized windows
+RECORDINGS_CONFIG = {
+    "window_days": 30,  # Zoom only accepts a one month from/to range
+    "fanout_concurrency": 4,
+    # Longest range /recordings, /recordings/batch and /archive accept;
+    # longer histories go through /jobs/recordings-history
+    "max_range_days": 366,
+}
+
+# Multi-worker mode (python zoom.py --workers N); workers share state through SQLite
+WORKER_CONFIG = {
+    "workers": int(os.environ.get("ZOOM_WORKERS", "1")),
+    "poll_interval": 0.1,  # Seconds between reads of the shared invalidation log
+    "retention": 300.0,  # Seconds invalidation log entries are kept
+    "lease_ttl": 30.0,  # Seconds a crashed worker's lease blocks others
+    "lease_poll": 0.05,  # Seconds between attempts to take a held lease
+}
+
+# Outbound request scheduling under Zoom's rate limits (each worker enforces its share)
+OUTBOUND_RATE_CONFIG = {
+    # Requests per second across all accounts (raised for load tests against a mock)
+    "global_rate": float(os.environ.get("ZOOM_GLOBAL_RATE", "30")) / WORKER_CONFIG["workers"],
+    "global_burst": max(1, 60 // WORKER_CONFIG["workers"]),
+    # Per Zoom account
+    "account_rate": float(os.environ.get("ZOOM_ACCOUNT_RATE", "10")) / WORKER_CONFIG["workers"],
+    "account_burst": max(1, 20 // WORKER_CONFIG["workers"]),
+    "max_accounts": 10000,  # Idle account buckets are pruned past this
+    "max_retries": 4,  # Retries of a 429 response
+    "backoff_base": 0.5,
+    "backoff_max": 30.0,
+    "default_deadline": 30.0,  # Seconds a request may spend waiting and retrying
+}
+
+# Outbound request priorities (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+# POST /recordings/batch fan-out limits
+BATCH_CONFIG = {
+    "concurrency": 8,
+    "max_users": 500,
+}
+
+# Local SQLite index of recording metadata, kept current by delta sync
+RECORDINGS_INDEX_CONFIG = {
+    "sqlite_path": os.environ.get("RECORDINGS_INDEX_PATH", "zoom_recordings.db"),
+    "sync_enabled": os.environ.get("RECORDINGS_SYNC_ENABLED", "0") == "1",
+    "sync_interval": 300.0,  # Seconds between background syncs of every user
+    "sync_concurrency": 2,
+    "initial_days": 365,  # History fetched on a user's first sync
+    "overlap_days": 2,  # Re-fetched before the watermark to catch late uploads
+}
+
+# Zoom webhook ingestion
+WEBHOOK_CONFIG = {
+    "queue_size": 10000,  # Events beyond this are refused so Zoom retries them
+    "batch_size": 200,
+    "batch_window": 0.5,  # Seconds to gather more events after the first one
+    "max_clock_skew": 300,  # Reject signed requests older than this (seconds)
+}
+
+# Cache-Control for conditional JSON responses (clients revalidate with ETags)
+RECORDINGS_CACHE_CONTROL = "private, no-cache"
+USER_INFO_CACHE_CONTROL = "private, max-age=60"
+
+# Recording file download proxy
+DOWNLOAD_CONFIG = {
+    "chunk_size": 256 * 1024,  # Bytes per chunk; memory per download stays near a few chunks
+    "read_timeout": 60.0,  # Seconds to wait for the next chunk from Zoom
+}
+
+# Upstream download headers passed through to the client
+DOWNLOAD_PASSTHROUGH_HEADERS = (
+    "content-length", "content-range", "accept-ranges", "content-type",
+    "content-disposition", "etag", "last-modified",
+)
+
+# Bulk recording archiver writing to local disk
+ARCHIVE_CONFIG = {
+    "root": os.environ.get("ARCHIVE_ROOT", "archive"),
+    "file_concurrency": 4,  # Files downloaded at once per job
+    "part_concurrency": 4,  # Ranged parts downloaded at once per file
+    "part_size": 16 * 1024 * 1024,  # Files larger than this are split into ranged parts
+    "max_errors": 50,  # Errors kept per job
+}
+
+# Background jobs for slow Zoom work (history fetches, exports, archives)
+JOB_CONFIG = {
+    "concurrency": 4,  # Jobs running at once per worker
+    "queue_size": 1000,  # Queued jobs beyond this are refused
+    "result_ttl": 3600.0,  # Seconds a finished job and its result are kept
+    "progress_interval": 0.5,  # Minimum seconds between persisted progress updates
+    "sweep_interval": 60.0,
+    "heartbeat_interval": 10.0,  # Seconds between saves of an unfinished job, even without progress
+    "orphan_after": 60.0,  # An unfinished job not saved for this long lost its worker and is failed
+    "stream_poll": 1.0,  # Seconds between status reads for another worker's job
+    "stream_heartbeat": 15.0,  # Seconds between repeated snapshots of an idle job
+}
+
+# In-process cache in front of Zoom recordings and user-info lookups
+RESPONSE_CACHE_CONFIG = {
+    "ttl": 30.0,  # Seconds an entry is served as fresh
+    "stale_while_revalidate": 60.0,  # Extra seconds a stale entry may be served while refetching
+    "max_entries": 1024,
+}
+
+# Background refresh of access tokens shortly before they expire
+TOKEN_REFRESH_CONFIG = {
+    "refresh_before": 300.0,  # Seconds before expiry to refresh
+    "jitter": 60.0,  # Random extra lead time so refreshes do not bunch up
+    "max_concurrency": 4,
+    "retry_delay": 30.0,  # Wait before retrying a failed refresh
+}
+
+# Token/state storage backend: "memory" (per process) or "sqlite" (shared file)
+TOKEN_STORE_CONFIG = {
+    "backend": os.environ.get("TOKEN_STORE_BACKEND", "memory"),
+    "sqlite_path": os.environ.get("TOKEN_STORE_PATH", "zoom_tokens.db"),
+    "cache_ttl": 5.0,  # Seconds a read-through entry is trusted before re-reading SQLite
+    "cache_entries": 10000,  # Read-through entries kept per namespace, least recently used dropped
+    "flush_interval": 0.05,  # Write-behind batching window in seconds
+}
+
+class TokenStore(MutableMapping):
+    """Dict-like storage for user tokens and OAuth states
+
+    Values must be replaced, not mutated in place, for a persistent
+    backend to see the change.
+    """
+
+    def invalidate(self, key=None):
+        """Forget cached reads (no-op for stores without a cache)"""
+    
+    def ping(self):
+        """Raise if the backing storage is unreachable"""
+    
+    async def flush(self):
+        """Write pending changes now"""
+    
+    async def purge(self, max_entries: Optional[int] = None) -> list:
+        """Delete expired entries shared with other processes (none for local stores)"""
+        return []
+    
+    async def close(self):
+        """Flush pending writes and release resources"""
+
+class MemoryTokenStore(TokenStore):
+    """Process-local store backed by a plain dict"""
+
+    def __init__(self):
+        self._data = {}
+    
+    def __getitem__(self, key):
+        return self._data[key]
+    
+    def __setitem__(self, key, value):
+        self._data[key] = value
+    
+    def __delitem__(self, key):
+        del self._data[key]
+    
+    def __iter__(self):
+        return iter(list(self._data))
+    
+    def __len__(self):
+        return len(self._data)
+
+class SQLiteDatabase:
+    """Single WAL-mode SQLite connection guarded for use from worker threads
+
+    The file is opened on first use; schema statements registered before
+    then run as it opens.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._schema = []
+        self._read_lock = threading.Lock()
+        self._read_conn: Optional[sqlite3.Connection] = None
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection, opened on first use (callers hold the lock)"""
+        if self._conn is None:
+            with startup.timed(f"sqlite:{os.path.basename(self.path)}"):
+                conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA busy_timeout=5000")
+                for migrate in self._schema:
+                    migrate(conn)
+            self._conn = conn
+        return self._conn
+    
+    def _add_migration(self, migrate):
+        with self.lock:
+            if self._conn is None:
+                self._schema.append(migrate)
+            else:
+                migrate(self._conn)
+    
+    def add_schema(self, sql: str):
+        """Run an idempotent DDL statement now, or when the file is opened"""
+        self._add_migration(lambda conn: conn.execute(sql))
+    
+    def add_column(self, table: str, column: str, definition: str):
+        """Add a column to a table created by an earlier version, if it is missing"""
+        def migrate(conn):
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        self._add_migration(migrate)
+    
+    def execute(self, sql: str, params=()) -> list:
+        """Run one statement and return all rows"""
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+    
+    def read(self, sql: str, params=()) -> list:
+        """Run a query on a second connection, so it never waits behind a write
+
+        In WAL mode readers see the last committed state without taking
+        the write lock, which keeps point lookups from the event loop fast.
+        """
+        if self.path == ":memory:":
+            return self.execute(sql, params)
+        with self._read_lock:
+            if self._read_conn is None:
+                with self.lock:
+                    self.conn  # Creates the file and schema
+                conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                conn.execute("PRAGMA busy_timeout=5000")
+                conn.execute("PRAGMA query_only=ON")
+                self._read_conn = conn
+            return self._read_conn.execute(sql, params).fetchall()
+    
+    def executemany(self, statements: list):
+        """Run (sql, params) pairs in a single transaction"""
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for sql, params in statements:
+                    self.conn.execute(sql, params)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+_MISSING = object()
+
+class SQLiteTokenStore(TokenStore):
+    """SQLite-backed store with a read-through cache and write-behind batching
+
+    Every flushed key is also logged for the other workers in the same
+    transaction, so they drop their cached read of it. The set of keys is
+    kept in memory for iteration and len(); keys another worker changed
+    are rechecked off the event loop.
+    """
+
+    def __init__(self, db: SQLiteDatabase, namespace: str, config,
+                 coordinator: "WorkerCoordinator", expires_at=None):
+        self.db = db
+        self.namespace = namespace
+        self.config = config
+        self.coordinator = coordinator
+        self.expires_at = expires_at  # value -> expiry timestamp, for stores that purge()
+        self._cache = OrderedDict()  # key -> (loaded_at, value or _MISSING), least recently used first
+        self._dirty = {}  # key -> value or _MISSING, not yet written
+        self._keys: Optional[set] = None  # Every key in the namespace, loaded on first use
+        self._stale_keys = set()  # Changed by another worker, membership not yet rechecked
+        self._recheck_task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None  # Only set while it is still waiting
+        self._flush_lock = asyncio.Lock()  # Batches reach SQLite in the order they were taken
+        self.db.add_schema(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        self.db.add_column("kv", "expires_at", "REAL")
+        self.db.add_schema(
+            "CREATE INDEX IF NOT EXISTS kv_expires_at ON kv (namespace, expires_at) "
+            "WHERE expires_at IS NOT NULL"
+        )
+        coordinator.subscribe(namespace, self.invalidate)
+    
+    def __getitem__(self, key):
+        if key in self._dirty:
+            value = self._dirty[key]
+        else:
+            cached = self._cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.config["cache_ttl"]:
+                self._cache.move_to_end(key)
+                value = cached[1]
+            else:
+                rows = self.db.read(
+                    "SELECT value FROM kv WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                )
+                value = json.loads(rows[0][0]) if rows else _MISSING
+                self._remember(key, value)
+                self._track(key, value)
+        
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+    
+    def __setitem__(self, key, value):
+        self._write(key, value)
+    
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._write(key, _MISSING)
+    
+    def __iter__(self):
+        return iter(list(self._key_set()))
+    
+    def __len__(self):
+        return len(self._key_set())
+    
+    def _key_set(self) -> set:
+        if self._keys is None:
+            rows = self.db.read("SELECT key FROM kv WHERE namespace = ?", (self.namespace,))
+            keys = {row[0] for row in rows}
+            for key, value in self._dirty.items():
+                if value is _MISSING:
+                    keys.discard(key)
+                else:
+                    keys.add(key)
+            self._keys = keys
+        return self._keys
+    
+    def _track(self, key, value):
+        if self._keys is not None:
+            if value is _MISSING:
+                self._keys.discard(key)
+            else:
+                self._keys.add(key)
+    
+    def _remember(self, key, value):
+        self._cache[key] = (time.monotonic(), value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.config["cache_entries"]:
+            self._cache.popitem(last=False)
+    
+    def ping(self):
+        self.db.execute("SELECT 1")
+    
+    def invalidate(self, key=None):
+        """Forget cached reads so the next access goes to SQLite"""
+        if key is None:
+            self._cache.clear()
+            self._keys = None
+            return
+        self._cache.pop(key, None)
+        if self._keys is None:
+            return
+        self._stale_keys.add(key)
+        if self._recheck_task is None:
+            try:
+                self._recheck_task = asyncio.get_running_loop().create_task(self._recheck_keys())
+            except RuntimeError:
+                self._keys = None
+    
+    async def _recheck_keys(self):
+        """Update the key set for keys other workers changed"""
+        try:
+            while self._stale_keys:
+                keys, self._stale_keys = list(self._stale_keys), set()
+                present = await asyncio.to_thread(self._present_keys, keys)
+                for key in keys:
+                    if key not in self._dirty:
+                        self._track(key, None if key in present else _MISSING)
+        except Exception as e:
+            logger.error(f"Token store key recheck failed for {self.namespace}: {e}")
+            self._keys = None
+        finally:
+            self._recheck_task = None
+    
+    def _present_keys(self, keys: list) -> set:
+        present = set()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.db.read(
+                f"SELECT key FROM kv WHERE namespace = ? AND key IN ({','.join('?' * len(chunk))})",
+                [self.namespace] + chunk
+            )
+            present.update(row[0] for row in rows)
+        return present
+    
+    def _write(self, key, value):
+        self._remember(key, value)
+        self._track(key, value)
+        self._dirty[key] = value
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. scripts): write through immediately
+            batch = self._take_dirty()
+            self._write_batch(batch)
+            self._drop_tombstones(batch)
+            return
+        
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+    
+    def _take_dirty(self) -> dict:
+        batch, self._dirty = self._dirty, {}
+        return batch
+    
+    def _write_batch(self, batch: dict):
+        now = time.time()
+        statements = []
+        for key, value in batch.items():
+            if value is _MISSING:
+                statements.append((
+                    "DELETE FROM kv WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ))
+            else:
+                expires_at = self.expires_at(value) if self.expires_at else None
+                statements.append((
+                    "INSERT OR REPLACE INTO kv (namespace, key, value, updated_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), now, expires_at)
+                ))
+        if statements:
+            statements.extend(self.coordinator.invalidation_statements(self.namespace, list(batch)))
+            self.db.executemany(statements)
+    
+    async def purge(self, max_entries: Optional[int] = None) -> list:
+        """Delete expired keys, then the soonest to expire beyond max_entries
+
+        Works on the shared table, so it also removes keys written by other
+        workers or by earlier processes. Returns the keys removed.
+        """
+        await self.flush()
+        keys = await asyncio.to_thread(self._purge, time.time(), max_entries)
+        for key in keys:
+            if key not in self._dirty:
+                self._cache.pop(key, None)
+                self._track(key, _MISSING)
+        return keys
+    
+    def _purge(self, now: float, max_entries: Optional[int]) -> list:
+        rows = self.db.read(
+            "SELECT key FROM kv WHERE namespace = ? AND expires_at <= ?", (self.namespace, now)
+        )
+        keys = [row[0] for row in rows]
+        if max_entries is not None:
+            rows = self.db.read(
+                "SELECT key FROM kv WHERE namespace = ? AND expires_at > ? "
+                "ORDER BY expires_at DESC LIMIT -1 OFFSET ?",
+                (self.namespace, now, max_entries)
+            )
+            keys.extend(row[0] for row in rows)
+        if keys:
+            statements = [
+                ("DELETE FROM kv WHERE namespace = ? AND key = ?", (self.namespace, key))
+                for key in keys
+            ]
+            statements.extend(self.coordinator.invalidation_statements(self.namespace, keys))
+            self.db.executemany(statements)
+        return keys
+    
+    async def _flush_later(self):
+        # A cancel from flush() lands here, before this task has touched any state
+        await asyncio.sleep(self.config["flush_interval"])
+        self._flush_task = None
+        try:
+            await self._flush_dirty()
+        except Exception as e:
+            logger.error(f"Token store flush failed for {self.namespace}: {e}")
+    
+    async def _flush_dirty(self):
+        async with self._flush_lock:
+            batch = self._take_dirty()
+            if not batch:
+                return
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception:
+                # Keep the batch for the next flush unless newer writes replaced it
+                for key, value in batch.items():
+                    self._dirty.setdefault(key, value)
+                raise
+            self._drop_tombstones(batch)
+    
+    def _drop_tombstones(self, batch: dict):
+        """Forget deletions once SQLite has them, so deleted keys cost no memory"""
+        for key, value in batch.items():
+            if value is _MISSING and key not in self._dirty:
+                cached = self._cache.get(key)
+                if cached is not None and cached[1] is _MISSING:
+                    del self._cache[key]
+    
+    async def flush(self):
+        """Write pending changes now instead of after the batching window"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self._flush_dirty()
+    
+    async def close(self):
+        """Write any pending changes before shutdown"""
+        await self.flush()
+
+_sqlite_databases = {}
+
+def open_sqlite(path: str) -> SQLiteDatabase:
+    """Shared SQLiteDatabase for a file path"""
+    if path not in _sqlite_databases:
+        _sqlite_databases[path] = SQLiteDatabase(path)
+    return _sqlite_databases[path]
+
+class WorkerCoordinator:
+    """Cross-worker invalidations and leases for a single process (all no-ops)
+
+    Invalidations are (channel, key) pairs, e.g. ("user_tokens", user_id).
+    Subscribers only hear about changes made by other workers.
+    """
 
-class ZoomOAuth:
     def __init__(self, config):
         self.config = config
-        self.auth_url = "https://zoom.us/oauth/authorize"
-        self.token_url = "https://zoom.us/oauth/token"
+        self._subscribers = {}  # channel -> [callback(key)]
     
-    def get_auth_url(self, state: str) -> str:
-        """Generate OAuth authorization URL"""
-        # Build the URL manually to ensure proper formatting
-        auth_url = (
-            f"{self.auth_url}?response_type=code"
-            f"&client_id={self.config['client_id']}"
-            f"&redirect_uri={self.config['redirect_uri']}"
-            f"&state={state}"
-            f"&scope=recording:read user:read"
+    def subscribe(self, channel: str, callback):
+        """Call callback(key) when another worker invalidates a key"""
+        self._subscribers.setdefault(channel, []).append(callback)
+    
+    def publish(self, channel: str, key: str):
+        """Tell the other workers a key changed"""
+    
+    def invalidation_statements(self, channel: str, keys: list) -> list:
+        """(sql, params) pairs that publish keys inside a caller's transaction"""
+        return []
+    
+    async def acquire(self, name: str, ttl: Optional[float] = None) -> bool:
+        """Try to take a named lease; True when this worker now holds it"""
+        return True
+    
+    async def release(self, name: str):
+        """Give up a lease"""
+    
+    @asynccontextmanager
+    async def lease(self, name: str):
+        """Hold a lease for the block, waiting while another worker has it"""
+        while not await self.acquire(name):
+            await asyncio.sleep(self.config["lease_poll"])
+        try:
+            yield
+        finally:
+            await self.release(name)
+    
+    def _deliver(self, channel: str, key: str):
+        for callback in self._subscribers.get(channel, ()):
+            try:
+                callback(key)
+            except Exception as e:
+                logger.error(f"Invalidation handler for {channel} failed: {e}")
+    
+    def start(self):
+        """Start listening for other workers' invalidations"""
+    
+    async def stop(self):
+        """Stop listening and publish anything still queued"""
+    
+    def stats(self) -> dict:
+        return {"backend": "local", "workers": self.config["workers"]}
+
+class SQLiteWorkerCoordinator(WorkerCoordinator):
+    """Coordinates workers sharing a SQLite file
+
+    Invalidations are appended to a log table that every worker polls;
+    leases are rows with an owner and an expiry, so a crashed owner's
+    lease lapses after lease_ttl.
+    """
+
+    def __init__(self, db: SQLiteDatabase, config):
+        super().__init__(config)
+        self.db = db
+        self.origin = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self._outbox = []  # (channel, key) published since the last poll
+        self._task: Optional[asyncio.Task] = None
+        self._polls = 0
+        self.published = 0
+        self.received = 0
+        self.leases_taken = 0
+        self.leases_contended = 0
+        self.db.add_schema(
+            "CREATE TABLE IF NOT EXISTS invalidations ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, "
+            "channel TEXT NOT NULL, key TEXT NOT NULL, created_at REAL NOT NULL)"
         )
-        return auth_url
+        self.db.add_schema(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._last_id: Optional[int] = None  # Read when polling starts
     
-    async def exchange_code_for_token(self, code: str) -> dict:
-        """Exchange authorization code for access token"""
-        auth_header = base64.b64encode(
-            f"{self.config['client_id']}:{self.config['client_secret']}".encode()
-        ).decode()
+    def publish(self, channel: str, key: str):
+        self.published += 1
+        if self._task is None:
+            self.db.executemany(self.invalidation_statements(channel, [key]))
+        else:
+            self._outbox.append((channel, key))
+    
+    def invalidation_statements(self, channel: str, keys: list) -> list:
+        now = time.time()
+        return [(
+            "INSERT INTO invalidations (origin, channel, key, created_at) VALUES (?, ?, ?, ?)",
+            (self.origin, channel, str(key), now)
+        ) for key in keys]
+    
+    async def acquire(self, name: str, ttl: Optional[float] = None) -> bool:
+        ttl = self.config["lease_ttl"] if ttl is None else ttl
+        held = await asyncio.to_thread(self._acquire, name, ttl)
+        if held:
+            self.leases_taken += 1
+        else:
+            self.leases_contended += 1
+        return held
+    
+    def _acquire(self, name: str, ttl: float) -> bool:
+        now = time.time()
+        self.db.execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at <= ? OR leases.owner = excluded.owner",
+            (name, self.origin, now + ttl, now)
+        )
+        rows = self.db.execute("SELECT owner FROM leases WHERE name = ?", (name,))
+        return bool(rows) and rows[0][0] == self.origin
+    
+    async def release(self, name: str):
+        await asyncio.to_thread(
+            self.db.execute, "DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.origin)
+        )
+    
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        outbox, self._outbox = self._outbox, []
+        await asyncio.to_thread(self._write_outbox, outbox)
+    
+    async def _run(self):
+        while True:
+            outbox, self._outbox = self._outbox, []
+            try:
+                rows = await asyncio.to_thread(self._exchange, outbox)
+            except Exception as e:
+                logger.error(f"Worker invalidation poll failed: {e}")
+                self._outbox[:0] = outbox
+                rows = []
+            for channel, key in rows:
+                self.received += 1
+                self._deliver(channel, key)
+            await asyncio.sleep(self.config["poll_interval"])
+    
+    def _write_outbox(self, outbox: list):
+        statements = []
+        for channel, key in outbox:
+            statements.extend(self.invalidation_statements(channel, [key]))
+        if statements:
+            self.db.executemany(statements)
+    
+    def _exchange(self, outbox: list) -> list:
+        """Publish queued invalidations and read the other workers' new ones"""
+        self._write_outbox(outbox)
+        if self._last_id is None:
+            # Only changes made after this worker started listening are relevant to it
+            self._last_id = self.db.execute("SELECT COALESCE(MAX(id), 0) FROM invalidations")[0][0]
+        rows = self.db.execute(
+            "SELECT id, origin, channel, key FROM invalidations WHERE id > ? ORDER BY id",
+            (self._last_id,)
+        )
+        if rows:
+            self._last_id = rows[-1][0]
         
-        headers = {
-            "Authorization": f"Basic {auth_header}",
-            "Content-Type": "application/x-www-form-urlencoded"
+        # Any worker may prune; a worker stalled past retention still has cache TTLs
+        self._polls += 1
+        if self._polls % 100 == 0:
+            self.db.execute(
+                "DELETE FROM invalidations WHERE created_at < ?",
+                (time.time() - self.config["retention"],)
+            )
+        return [(channel, key) for _, origin, channel, key in rows if origin != self.origin]
+    
+    def stats(self) -> dict:
+        return {
+            "backend": "sqlite",
+            "workers": self.config["workers"],
+            "origin": self.origin,
+            "running": self._task is not None and not self._task.done(),
+            "last_invalidation_id": self._last_id,
+            "published": self.published,
+            "received": self.received,
+            "leases_taken": self.leases_taken,
+            "leases_contended": self.leases_contended,
         }
+
+def create_worker_coordinator() -> WorkerCoordinator:
+    """Coordinate through the token store's SQLite file when it is shared"""
+    if TOKEN_STORE_CONFIG["backend"] == "sqlite":
+        return SQLiteWorkerCoordinator(open_sqlite(TOKEN_STORE_CONFIG["sqlite_path"]), WORKER_CONFIG)
+    return WorkerCoordinator(WORKER_CONFIG)
+
+def create_token_store(namespace: str, expires_at=None) -> TokenStore:
+    """Build a store for the configured backend
+
+    expires_at maps a value to its expiry time, which a shared store keeps
+    in an indexed column for purge().
+    """
+    if TOKEN_STORE_CONFIG["backend"] == "sqlite":
+        db = open_sqlite(TOKEN_STORE_CONFIG["sqlite_path"])
+        return SQLiteTokenStore(db, namespace, TOKEN_STORE_CONFIG, worker_coordinator, expires_at)
+    return MemoryTokenStore()
+
+# OAuth login states expire and are capped so abandoned logins cannot pile up
+OAUTH_STATE_CONFIG = {
+    "ttl": 600.0,  # Seconds a login attempt may take
+    "max_entries": 10000,  # Across all workers sharing the store
+    "purge_interval": 60.0,  # Seconds between purges of the shared store
+}
+
+class OAuthStateStore:
+    """Expiring, bounded set of outstanding OAuth states
+
+    States are kept in issue order, and every state has the same TTL, so
+    expired entries are always at the front and a sweep only touches
+    those. The backing store holds state -> expires_at so a callback can
+    be verified by whichever process shares that store. States this
+    worker never saw (issued elsewhere, or before a restart) are removed
+    by a periodic purge of the backing store, which also enforces the
+    cap across all workers.
+    """
+
+    def __init__(self, backend: TokenStore, config):
+        self.backend = backend
+        self.config = config
+        self._issued = OrderedDict()  # state -> expires_at, oldest first
+        self._purge_task: Optional[asyncio.Task] = None
+        self._purged_at = 0.0
+        self.issued = 0
+        self.consumed = 0
+        self.expired = 0
+        self.evicted = 0
+        self.rejected = 0
+        self.purged = 0
+    
+    def add(self, state: str):
+        """Record a newly issued state"""
+        self.sweep()
+        while len(self._issued) >= self.config["max_entries"]:
+            oldest, _ = self._issued.popitem(last=False)
+            self.backend.pop(oldest, None)
+            self.evicted += 1
         
-        data = {
-            "grant_type": "authorization_code",
-            "code": code,
-            "redirect_uri": self.config["redirect_uri"]
+        expires_at = time.time() + self.config["ttl"]
+        self._issued[state] = expires_at
+        self.backend[state] = expires_at
+        self.issued += 1
+        self._maybe_purge()
+    
+    def _maybe_purge(self):
+        """Purge the shared store every purge_interval, or sooner once it is over the cap"""
+        if self._purge_task is not None:
+            return
+        now = time.monotonic()
+        if (now - self._purged_at < self.config["purge_interval"]
+                and len(self.backend) <= self.config["max_entries"]):
+            return
+        self._purged_at = now
+        try:
+            self._purge_task = asyncio.get_running_loop().create_task(self.purge())
+        except RuntimeError:
+            pass  # No event loop (e.g. scripts): the next add() on a loop purges
+    
+    async def purge(self):
+        """Remove expired and over-cap states from the shared store"""
+        try:
+            keys = await self.backend.purge(self.config["max_entries"])
+            for state in keys:
+                self._issued.pop(state, None)
+            self.purged += len(keys)
+        except Exception as e:
+            logger.error(f"OAuth state purge failed: {e}")
+        finally:
+            self._purge_task = None
+    
+    def consume(self, state: str) -> bool:
+        """Remove a state and report whether it was valid and unexpired"""
+        self.sweep()
+        self._issued.pop(state, None)
+        expires_at = self.backend.pop(state, None)
+        if expires_at is None:
+            self.rejected += 1
+            return False
+        if expires_at <= time.time():
+            self.expired += 1
+            return False
+        self.consumed += 1
+        return True
+    
+    def sweep(self):
+        """Drop expired states from the front of the issue order"""
+        now = time.time()
+        while self._issued:
+            state, expires_at = next(iter(self._issued.items()))
+            if expires_at > now:
+                break
+            del self._issued[state]
+            if self.backend.pop(state, None) is not None:
+                self.expired += 1
+    
+    def __len__(self):
+        return len(self.backend)
+    
+    def stats(self) -> dict:
+        """State counters"""
+        self.sweep()
+        return {
+            "outstanding": len(self),
+            "issued_here": len(self._issued),
+            "max_entries": self.config["max_entries"],
+            "issued": self.issued,
+            "consumed": self.consumed,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "rejected": self.rejected,
+            "purged": self.purged,
         }
-        
-        logger.info(f"Sending token exchange request to: {self.token_url}")
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(self.token_url, headers=headers, data=data)
-            
-            if response.status_code != 200:
-                error_detail = response.text
-                logger.error(f"Token exchange failed: {error_detail}")
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Token exchange failed: {error_detail}"
-                )
-            
-            return response.json()
     
-    async def refresh_token(self, refresh_token: str) -> dict:
-        """Refresh access token using refresh token"""
-        auth_header = base64.b64encode(
-            f"{self.config['client_id']}:{self.config['client_secret']}".encode()
-        ).decode()
-        
-        headers = {
-            "Authorization": f"Basic {auth_header}",
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
-        
-        data = {
-            "grant_type": "refresh_token",
-            "refresh_token": refresh_token
+    async def flush(self):
+        """Write pending state changes now"""
+        await self.backend.flush()
+    
+    async def close(self):
+        """Flush the backing store"""
+        await self.backend.close()
+
+# Token and OAuth state storage (in-memory unless TOKEN_STORE_BACKEND=sqlite)
+worker_coordinator = create_worker_coordinator()
+user_tokens = create_token_store("user_tokens")
+oauth_states = OAuthStateStore(
+    create_token_store("oauth_states", expires_at=lambda expires_at: expires_at), OAUTH_STATE_CONFIG
+)
+
+class Counter:
+    """Prometheus-style counter keyed by label values"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}  # label values tuple -> float
+    
+    def inc(self, *label_values, amount: float = 1.0):
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+    
+    def samples(self):
+        for label_values, value in self._values.items():
+            yield self.name, dict(zip(self.labels, label_values)), value
+
+class Histogram:
+    """Prometheus-style histogram with fixed buckets"""
+
+    type = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [per-bucket counts (+Inf last), sum]
+    
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+    
+    def samples(self):
+        for label_values, (counts, total) in self._series.items():
+            labels = dict(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", {**labels, "le": le}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+class CallbackMetric:
+    """Gauge or counter read from a callback at scrape time
+
+    The callback returns a number or a {label values tuple: number} dict.
+    """
+
+    def __init__(self, name: str, help: str, callback, labels: tuple = (), type: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.callback = callback
+        self.labels = labels
+        self.type = type
+    
+    def samples(self):
+        values = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for label_values, value in values.items():
+            yield self.name, dict(zip(self.labels, label_values)), value
+
+class MetricsRegistry:
+    """Collects metrics and renders the Prometheus text format"""
+
+    def __init__(self):
+        self.metrics = []
+    
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+    
+    @staticmethod
+    def _labels(labels: dict) -> str:
+        if not labels:
+            return ""
+        def escape(value) -> str:
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            try:
+                for name, labels, value in metric.samples():
+                    lines.append(f"{name}{self._labels(labels)} {float(value):g}")
+            except Exception as e:
+                logger.warning(f"Metric {metric.name} failed to collect: {e}")
+        return "\n".join(lines) + "\n"
+
+# Initialize metrics
+metrics = MetricsRegistry()
+HTTP_REQUEST_DURATION = metrics.register(Histogram(
+    "http_request_duration_seconds", "Inbound request latency by route",
+    ("method", "route", "status")
+))
+ZOOM_REQUEST_DURATION = metrics.register(Histogram(
+    "zoom_request_duration_seconds", "Outbound Zoom call latency by endpoint",
+    ("endpoint", "status")
+))
+ZOOM_TOKEN_REFRESHES = metrics.register(Counter(
+    "zoom_token_refreshes_total", "Token refreshes sent to Zoom, by trigger", ("trigger",)
+))
+ZOOM_RATE_LIMITED = metrics.register(Counter(
+    "zoom_rate_limited_total", "429 responses received from Zoom", ("endpoint",)
+))
+
+async def timed_zoom_call(endpoint: str, send) -> "httpx.Response":
+    """Await send() and record its latency under an endpoint name"""
+    started = time.perf_counter()
+    status = "error"
+    try:
+        response = await send()
+        status = str(response.status_code)
+        if response.status_code == 429:
+            ZOOM_RATE_LIMITED.inc(endpoint)
+        return response
+    finally:
+        ZOOM_REQUEST_DURATION.observe(time.perf_counter() - started, endpoint, status)
+
+class HTTPClientPool:
+    """Process-wide pooled httpx.AsyncClient shared by all Zoom handlers"""
+
+    def __init__(self, config):
+        self.config = config
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    def start(self) -> "httpx.AsyncClient":
+        """Create the shared client if it does not exist yet"""
+        if self._client is None or self._client.is_closed:
+            http2 = self.config["http2"]
+            if http2 and importlib.util.find_spec("h2") is None:
+                logger.warning("HTTP/2 requested but 'h2' is not installed; using HTTP/1.1")
+                http2 = False
+            
+            # Importing httpx and building the client (TLS context, CA bundle)
+            # is the costliest cold-start step, so it waits for the first Zoom call
+            with startup.timed("http_pool"):
+                import httpx
+                self._client = httpx.AsyncClient(
+                    http2=http2,
+                    limits=httpx.Limits(
+                        max_connections=self.config["max_connections"],
+                        max_keepalive_connections=self.config["max_keepalive_connections"],
+                        keepalive_expiry=self.config["keepalive_expiry"],
+                    ),
+                    timeout=httpx.Timeout(
+                        self.config["default_timeout"],
+                        connect=self.config["connect_timeout"],
+                    ),
+                )
+            logger.info(f"Started shared HTTP client (http2={http2})")
+        return self._client
+    
+    async def close(self):
+        """Close the shared client and all pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """Shared client, created on first use outside the app lifespan"""
+        return self.start()
+    
+    def timeout_for(self, url: str) -> "httpx.Timeout":
+        """Per-host timeout for an outbound request"""
+        import httpx
+        host = urlsplit(url).hostname or ""
+        seconds = self.config["host_timeouts"].get(host, self.config["default_timeout"])
+        return httpx.Timeout(seconds, connect=self.config["connect_timeout"])
+    
+    def stats(self) -> dict:
+        """Connection pool usage (best effort, reads httpcore pool state)"""
+        stats = {
+            "started": self._client is not None and not self._client.is_closed,
+            "max_connections": self.config["max_connections"],
+            "max_keepalive_connections": self.config["max_keepalive_connections"],
+            "connections_open": 0,
+            "connections_idle": 0,
+            "requests_active": 0,
+            "requests_waiting": 0,
+        }
+        if not stats["started"]:
+            return stats
+        
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        requests = list(getattr(pool, "_requests", []))
+        waiting = sum(1 for r in requests if r.is_queued())
+        stats.update({
+            "connections_open": len(connections),
+            "connections_idle": sum(1 for c in connections if c.is_idle()),
+            "requests_active": len(requests) - waiting,
+            "requests_waiting": waiting,
+        })
+        return stats
+
+def split_date_range(from_date: str, to_date: str, window_days: int) -> list:
+    """Split an inclusive yyyy-mm-dd range into consecutive (from, to) windows"""
+    try:
+        start = date.fromisoformat(from_date)
+        end = date.fromisoformat(to_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in yyyy-mm-dd format")
+    
+    if end < start:
+        raise HTTPException(status_code=400, detail="from_date must not be after to_date")
+    
+    windows = []
+    while start <= end:
+        window_end = min(start + timedelta(days=window_days - 1), end)
+        windows.append((start.isoformat(), window_end.isoformat()))
+        start = window_end + timedelta(days=1)
+    return windows
+
+def merge_meetings(pages) -> list:
+    """Merge meeting lists, dropping duplicate UUIDs, newest first"""
+    merged = {}
+    for meetings in pages:
+        for meeting in meetings:
+            merged.setdefault(meeting.get("uuid") or meeting.get("id"), meeting)
+    return sorted(merged.values(), key=lambda m: m.get("start_time", ""), reverse=True)
+
+class ResponseCache:
+    """TTL + LRU cache for Zoom responses with per-user invalidation
+
+    Each worker has its own cache; invalidations are broadcast to the rest.
+    """
+
+    def __init__(self, config, coordinator: WorkerCoordinator):
+        self.config = config
+        self.coordinator = coordinator
+        self._entries = OrderedDict()  # key -> (stored_at, user_id, value)
+        self._user_keys = {}  # user_id -> set of keys
+        self._generations = {}  # user_id -> bumped on every invalidation
+        self._revalidations = {}  # key -> background refresh task
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        coordinator.subscribe("response_cache", self._invalidate_local)
+    
+    async def get_or_load(self, key: tuple, user_id: str, loader):
+        """Return a cached value, or await loader() and cache its result"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, _, value = entry
+            age = time.monotonic() - stored_at
+            if age < self.config["ttl"]:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if age < self.config["ttl"] + self.config["stale_while_revalidate"]:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._revalidations:
+                    self._revalidations[key] = asyncio.create_task(
+                        self._revalidate(key, user_id, loader)
+                    )
+                return value
+        
+        self.misses += 1
+        generation = self._generations.get(user_id, 0)
+        value = await loader()
+        self._store(key, user_id, value, generation)
+        return value
+    
+    async def _revalidate(self, key: tuple, user_id: str, loader):
+        """Refetch a stale entry in the background"""
+        outbound_priority.set(PRIORITY_BACKGROUND)
+        generation = self._generations.get(user_id, 0)
+        try:
+            self._store(key, user_id, await loader(), generation)
+        except Exception as e:
+            logger.warning(f"Cache revalidation failed for {key}: {e}")
+        finally:
+            self._revalidations.pop(key, None)
+    
+    def _store(self, key: tuple, user_id: str, value, generation: int):
+        """Insert an entry unless the user was invalidated while it loaded"""
+        if self._generations.get(user_id, 0) != generation:
+            return
+        
+        self._entries[key] = (time.monotonic(), user_id, value)
+        self._entries.move_to_end(key)
+        self._user_keys.setdefault(user_id, set()).add(key)
+        
+        while len(self._entries) > self.config["max_entries"]:
+            old_key, (_, old_user, _) = self._entries.popitem(last=False)
+            self._discard_user_key(old_user, old_key)
+            self.evictions += 1
+    
+    def _discard_user_key(self, user_id: str, key: tuple):
+        keys = self._user_keys.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[user_id]
+    
+    def invalidate_user(self, user_id: str):
+        """Drop every cached entry belonging to a user, in every worker"""
+        self._invalidate_local(user_id)
+        self.coordinator.publish("response_cache", user_id)
+    
+    def _invalidate_local(self, user_id: str):
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        for key in self._user_keys.pop(user_id, ()):
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+    
+    def stats(self) -> dict:
+        """Cache counters"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.config["max_entries"],
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "revalidating": len(self._revalidations),
+        }
+
+class SingleFlight:
+    """Share one in-flight coroutine between concurrent callers with the same key"""
+
+    def __init__(self):
+        self._calls = {}  # key -> asyncio.Task
+        self.started = 0
+        self.coalesced = 0
+    
+    async def do(self, key: tuple, factory):
+        """Await factory() unless an identical call is already running"""
+        task = self._calls.get(key)
+        if task is None:
+            self.started += 1
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+        
+        # Shield so one caller going away does not cancel the shared call
+        return await asyncio.shield(task)
+    
+    def _finish(self, key: tuple, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            task.exception()
+    
+    def stats(self) -> dict:
+        """Single-flight counters"""
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
+
+async def wait_event(event: asyncio.Event, timeout: Optional[float]):
+    """Wait for an event or a timeout without swallowing cancellation"""
+    if timeout is None:
+        await event.wait()
+        return
+    
+    timer = asyncio.get_running_loop().call_later(max(0.0, timeout), event.set)
+    try:
+        await event.wait()
+    finally:
+        timer.cancel()
+
+class TokenBucket:
+    """Token bucket that can also be paused until a point in time"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token can be taken"""
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.paused_until - now)
+    
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+    
+    def pause(self, until: float):
+        """Hand out nothing before `until` (monotonic time)"""
+        self.paused_until = max(self.paused_until, until)
+        self.tokens = min(self.tokens, 0)
+    
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and self.paused_until <= now
+
+# Priority and deadline of outbound calls made by the current task
+outbound_priority: ContextVar[int] = ContextVar("outbound_priority", default=PRIORITY_INTERACTIVE)
+outbound_deadline: ContextVar[Optional[float]] = ContextVar("outbound_deadline", default=None)
+
+@contextmanager
+def outbound_context(priority: Optional[int] = None, timeout: Optional[float] = None):
+    """Set priority and/or a deadline (seconds from now) for Zoom calls in this block"""
+    tokens = []
+    if priority is not None:
+        tokens.append((outbound_priority, outbound_priority.set(priority)))
+    if timeout is not None:
+        tokens.append((outbound_deadline, outbound_deadline.set(time.monotonic() + timeout)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class OutboundScheduler:
+    """Grants outbound Zoom requests under global and per-account token buckets
+
+    Waiters are served in priority order. A waiter whose account bucket is
+    empty does not hold up waiters for other accounts. Requests without an
+    account (OAuth token calls) are only held to the global bucket.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._global = TokenBucket(config["global_rate"], config["global_burst"])
+        self._accounts = {}  # account -> TokenBucket
+        self._waiters = []  # [priority, seq, account, future]
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.granted = 0
+        self.throttled = 0
+        self.retries = 0
+        self.deadline_exceeded = 0
+    
+    def _bucket(self, account: str) -> TokenBucket:
+        bucket = self._accounts.get(account)
+        if bucket is None:
+            if len(self._accounts) >= self.config["max_accounts"]:
+                now = time.monotonic()
+                for key in [k for k, b in self._accounts.items() if b.is_idle(now)]:
+                    del self._accounts[key]
+            bucket = TokenBucket(self.config["account_rate"], self.config["account_burst"])
+            self._accounts[account] = bucket
+        return bucket
+    
+    def _deadline(self) -> float:
+        deadline = outbound_deadline.get()
+        if deadline is None:
+            deadline = time.monotonic() + self.config["default_deadline"]
+        return deadline
+    
+    async def acquire(self, account: Optional[str], priority: int, deadline: float):
+        """Wait for a request slot, or raise 503 if the deadline passes first"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.append([priority, next(self._seq), account, future])
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._dispatch())
+        self._wakeup.set()
+        
+        timer = loop.call_later(max(0.0, deadline - time.monotonic()), self._expire, future)
+        try:
+            await future
+        except asyncio.TimeoutError:
+            self.deadline_exceeded += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Timed out waiting for Zoom rate limit capacity"
+            )
+        finally:
+            timer.cancel()
+    
+    @staticmethod
+    def _expire(future: asyncio.Future):
+        if not future.done():
+            future.set_exception(asyncio.TimeoutError())
+    
+    async def _dispatch(self):
+        while True:
+            now = time.monotonic()
+            self._waiters = [w for w in self._waiters if not w[3].done()]
+            self._waiters.sort()
+            
+            sleep_for = None
+            for waiter in list(self._waiters):
+                global_wait = self._global.wait_time(now)
+                if global_wait > 0:
+                    sleep_for = global_wait
+                    break
+                
+                bucket = self._bucket(waiter[2]) if waiter[2] is not None else None
+                account_wait = bucket.wait_time(now) if bucket is not None else 0.0
+                if account_wait > 0:
+                    sleep_for = account_wait if sleep_for is None else min(sleep_for, account_wait)
+                    continue
+                
+                self._global.take(now)
+                if bucket is not None:
+                    bucket.take(now)
+                self._waiters.remove(waiter)
+                waiter[3].set_result(None)
+                self.granted += 1
+            
+            self._wakeup.clear()
+            if not self._waiters:
+                sleep_for = None
+            await wait_event(self._wakeup, sleep_for)
+    
+    def _backoff(self, attempt: int, response: "httpx.Response") -> float:
+        delay = min(
+            self.config["backoff_max"],
+            self.config["backoff_base"] * (2 ** attempt)
+        ) * random.uniform(0.5, 1.0)
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        return max(delay, retry_after or 0.0)
+    
+    async def send(self, account: Optional[str], send) -> "httpx.Response":
+        """Run send() within rate limits, retrying 429s while the deadline allows"""
+        priority = outbound_priority.get()
+        deadline = self._deadline()
+        
+        for attempt in range(self.config["max_retries"] + 1):
+            await self.acquire(account, priority, deadline)
+            response = await send()
+            if response.status_code != 429:
+                return response
+            
+            self.throttled += 1
+            delay = self._backoff(attempt, response)
+            if attempt == self.config["max_retries"] or time.monotonic() + delay > deadline:
+                break
+            
+            self.retries += 1
+            if account is None:
+                logger.warning(f"Zoom rate limited an OAuth call; retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            # Hold back every request for this account, not just the retry
+            logger.warning(f"Zoom rate limited account {account}; retrying in {delay:.2f}s")
+            self._bucket(account).pause(time.monotonic() + delay)
+        
+        return response
+    
+    async def stop(self):
+        """Stop the dispatcher and fail outstanding waiters"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for waiter in self._waiters:
+            waiter[3].cancel()
+        self._waiters = []
+    
+    def stats(self) -> dict:
+        """Scheduler counters"""
+        waiting = {}
+        for priority, _, _, future in self._waiters:
+            if not future.done():
+                waiting[priority] = waiting.get(priority, 0) + 1
+        return {
+            "waiting_interactive": waiting.get(PRIORITY_INTERACTIVE, 0),
+            "waiting_background": waiting.get(PRIORITY_BACKGROUND, 0),
+            "accounts": len(self._accounts),
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "deadline_exceeded": self.deadline_exceeded,
+        }
+
+# Initialize outbound rate-limit scheduler
+outbound_scheduler = OutboundScheduler(OUTBOUND_RATE_CONFIG)
+
+def zoom_account_for(user_id: str) -> str:
+    """Rate-limit bucket key for a user: their Zoom account when known"""
+    token_info = user_tokens.get(user_id) or {}
+    return token_info.get("user_info", {}).get("account_id") or user_id
+
+def raise_for_zoom_status(response: "httpx.Response"):
+    """Map a non-200 Zoom response onto an HTTPException"""
+    if response.status_code == 401:
+        raise HTTPException(status_code=401, detail="Access token expired")
+    elif response.status_code == 429:
+        retry_after = response.headers.get("Retry-After")
+        raise HTTPException(
+            status_code=429,
+            detail=f"Zoom rate limit exceeded: {response.text}",
+            headers={"Retry-After": retry_after} if retry_after else None
+        )
+    elif response.status_code != 200:
+        raise HTTPException(
+            status_code=response.status_code, 
+            detail=f"API request failed: {response.text}"
+        )
+
+# Initialize shared HTTP client pool
+http_pool = HTTPClientPool(HTTP_CLIENT_CONFIG)
+
+class ZoomOAuth:
+    def __init__(self, config, http: HTTPClientPool, scheduler: OutboundScheduler):
+        self.config = config
+        self.http = http
+        self.scheduler = scheduler
+        self.auth_url = config["auth_url"]
+        self.token_url = config["token_url"]
+    
+    def get_auth_url(self, state: str) -> str:
+        """Generate OAuth authorization URL"""
+        # Build the URL manually to ensure proper formatting
+        auth_url = (
+            f"{self.auth_url}?response_type=code"
+            f"&client_id={self.config['client_id']}"
+            f"&redirect_uri={self.config['redirect_uri']}"
+            f"&state={state}"
+            f"&scope=recording:read user:read"
+        )
+        return auth_url
+    
+    async def exchange_code_for_token(self, code: str) -> dict:
+        """Exchange authorization code for access token"""
+        auth_header = base64.b64encode(
+            f"{self.config['client_id']}:{self.config['client_secret']}".encode()
+        ).decode()
+        
+        headers = {
+            "Authorization": f"Basic {auth_header}",
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
+        
+        data = {
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": self.config["redirect_uri"]
+        }
+        
+        logger.info(f"Sending token exchange request to: {self.token_url}")
+        
+        # Token calls are per user, so no account bucket: only the global limit applies
+        response = await self.scheduler.send(None, lambda: timed_zoom_call(
+            "token_exchange", lambda: self.http.client.post(
+                self.token_url, headers=headers, data=data,
+                timeout=self.http.timeout_for(self.token_url)
+            )
+        ))
+        
+        if response.status_code != 200:
+            error_detail = response.text
+            logger.error(f"Token exchange failed: {error_detail}")
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Token exchange failed: {error_detail}"
+            )
+        
+        return response.json()
+    
+    async def refresh_token(self, refresh_token: str) -> dict:
+        """Refresh access token using refresh token"""
+        auth_header = base64.b64encode(
+            f"{self.config['client_id']}:{self.config['client_secret']}".encode()
+        ).decode()
+        
+        headers = {
+            "Authorization": f"Basic {auth_header}",
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
+        
+        data = {
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token
+        }
+        
+        response = await self.scheduler.send(None, lambda: timed_zoom_call(
+            "token_refresh", lambda: self.http.client.post(
+                self.token_url, headers=headers, data=data,
+                timeout=self.http.timeout_for(self.token_url)
+            )
+        ))
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Token refresh failed: {response.text}"
+            )
+        
+        return response.json()
+
+# Initialize OAuth handler
+zoom_oauth = ZoomOAuth(ZOOM_CONFIG, http_pool, outbound_scheduler)
+
+class ZoomAPI:
+    def __init__(self, config, http: HTTPClientPool, cache: ResponseCache,
+                 scheduler: OutboundScheduler):
+        self.config = config
+        self.http = http
+        self.cache = cache
+        self.scheduler = scheduler
+        self.flights = SingleFlight()
+    
+    async def _get(self, endpoint: str, url: str, access_token: str, account: str,
+                   params: Optional[dict] = None) -> dict:
+        """GET a Zoom API URL under the rate-limit scheduler"""
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+        
+        response = await self.scheduler.send(account, lambda: timed_zoom_call(
+            endpoint, lambda: self.http.client.get(
+                url, headers=headers, params=params, timeout=self.http.timeout_for(url)
+            )
+        ))
+        raise_for_zoom_status(response)
+        return response.json()
+    
+    async def get_user_recordings(self, access_token: str, user_id: str = "me", 
+                                 from_date: Optional[str] = None, 
+                                 to_date: Optional[str] = None,
+                                 page_size: int = 30,
+                                 next_page_token: str = "",
+                                 use_cache: bool = True) -> dict:
+        """Fetch one page of user recordings, served from the cache when possible"""
+        key = ("recordings", user_id, from_date, to_date, page_size, next_page_token)
+        loader = lambda: self.flights.do(key, lambda: self._fetch_user_recordings(
+            access_token, user_id, from_date, to_date, page_size, next_page_token
+        ))
+        if not use_cache:
+            return await loader()
+        return await self.cache.get_or_load(key, user_id, loader)
+    
+    async def _fetch_user_recordings(self, access_token: str, user_id: str,
+                                    from_date: Optional[str], to_date: Optional[str],
+                                    page_size: int, next_page_token: str) -> dict:
+        """Fetch one page of user recordings from Zoom API"""
+        params = {
+            "page_size": page_size,
+            "next_page_token": next_page_token
+        }
+        
+        if from_date:
+            params["from"] = from_date
+        if to_date:
+            params["to"] = to_date
+        
+        url = f"{self.config['base_url']}/users/{user_id}/recordings"
+        return await self._get(
+            "get_user_recordings", url, access_token, zoom_account_for(user_id), params
+        )
+    
+    async def iter_user_recordings(self, access_token: str, user_id: str = "me",
+                                  from_date: Optional[str] = None,
+                                  to_date: Optional[str] = None,
+                                  first_page: Optional[dict] = None,
+                                  use_cache: bool = True):
+        """Yield meetings from every recordings page, prefetching the next page
+
+        Only the first page may come from or go into the response cache, so
+        walking a large account does not fill the cache with its pages.
+        """
+        page = first_page
+        if page is None:
+            page = await self.get_user_recordings(
+                access_token, user_id, from_date, to_date, page_size=ZOOM_MAX_PAGE_SIZE,
+                use_cache=use_cache
+            )
+        
+        while True:
+            # Start fetching the next page while the caller consumes this one
+            next_page = None
+            token = page.get("next_page_token")
+            if token:
+                next_page = asyncio.create_task(self.get_user_recordings(
+                    access_token, user_id, from_date, to_date,
+                    page_size=ZOOM_MAX_PAGE_SIZE, next_page_token=token, use_cache=False
+                ))
+            
+            try:
+                for meeting in page.get("meetings", []):
+                    yield meeting
+            except BaseException:
+                # Consumer stopped early (e.g. client disconnected)
+                if next_page is not None:
+                    next_page.cancel()
+                raise
+            
+            if next_page is None:
+                return
+            page = await next_page
+    
+    async def get_user_recordings_range(self, access_token: str, user_id: str,
+                                       windows: list, use_cache: bool = True) -> dict:
+        """Fetch every meeting across date windows concurrently and merge them"""
+        semaphore = asyncio.Semaphore(RECORDINGS_CONFIG["fanout_concurrency"])
+        
+        async def fetch_window(window_from, window_to):
+            async with semaphore:
+                return [
+                    meeting async for meeting in self.iter_user_recordings(
+                        access_token, user_id, window_from, window_to, use_cache=use_cache
+                    )
+                ]
+        
+        tasks = [asyncio.create_task(fetch_window(*window)) for window in windows]
+        try:
+            pages = await asyncio.gather(*tasks)
+        except BaseException:
+            # Stop the remaining windows once one of them has failed
+            for task in tasks:
+                task.cancel()
+            raise
+        meetings = merge_meetings(pages)
+        
+        return {
+            "from": windows[0][0],
+            "to": windows[-1][1],
+            "page_size": len(meetings),
+            "total_records": len(meetings),
+            "next_page_token": "",
+            "meetings": meetings
+        }
+    
+    async def iter_user_recordings_range(self, access_token: str, user_id: str,
+                                        windows: list,
+                                        first_page: Optional[dict] = None,
+                                        use_cache: bool = True):
+        """Yield meetings across date windows, newest window first, without duplicates"""
+        seen = set()
+        for window_from, window_to in reversed(windows):
+            async for meeting in self.iter_user_recordings(
+                access_token, user_id, window_from, window_to, first_page=first_page,
+                use_cache=use_cache
+            ):
+                key = meeting.get("uuid") or meeting.get("id")
+                if key not in seen:
+                    seen.add(key)
+                    yield meeting
+            first_page = None
+    
+    async def get_meeting_recordings(self, access_token: str, user_id: str,
+                                     meeting_id: str) -> dict:
+        """Get one meeting's recording files (cached per user and meeting)"""
+        key = ("meeting_recordings", user_id, meeting_id)
+        # Meeting UUIDs that start with or contain "/" must be double encoded
+        encoded = quote(quote(meeting_id, safe=""), safe="")
+        url = f"{self.config['base_url']}/meetings/{encoded}/recordings"
+        loader = lambda: self.flights.do(key, lambda: self._get(
+            "get_meeting_recordings", url, access_token, zoom_account_for(user_id)
+        ))
+        return await self.cache.get_or_load(key, user_id, loader)
+    
+    async def open_download(self, access_token: str, download_url: str,
+                            headers: dict) -> "httpx.Response":
+        """Start streaming a recording file; the caller must close the response"""
+        import httpx
+        timeout = httpx.Timeout(
+            DOWNLOAD_CONFIG["read_timeout"], connect=self.http.config["connect_timeout"]
+        )
+        request = self.http.client.build_request(
+            "GET", download_url,
+            headers={**headers, "Authorization": f"Bearer {access_token}"},
+            timeout=timeout
+        )
+        response = await self.http.client.send(request, stream=True, follow_redirects=True)
+        
+        if response.status_code in (200, 206, 304, 416):
+            return response
+        
+        await response.aread()
+        await response.aclose()
+        raise_for_zoom_status(response)
+        return response
+    
+    async def get_user_info(self, access_token: str, user_id: Optional[str] = None) -> dict:
+        """Get user information (cached and coalesced when the owning user_id is known)"""
+        if user_id is None:
+            return await self._fetch_user_info(access_token, user_id)
+        
+        key = ("user_info", user_id)
+        loader = lambda: self.flights.do(key, lambda: self._fetch_user_info(access_token, user_id))
+        return await self.cache.get_or_load(key, user_id, loader)
+    
+    async def _fetch_user_info(self, access_token: str, user_id: Optional[str]) -> dict:
+        """Get user information from Zoom API"""
+        url = f"{self.config['base_url']}/users/me"
+        # Before login completes the owning account is unknown; bucket by token
+        account = zoom_account_for(user_id) if user_id else access_token
+        return await self._get("get_user_info", url, access_token, account)
+
+# Initialize Zoom API handler
+response_cache = ResponseCache(RESPONSE_CACHE_CONFIG, worker_coordinator)
+zoom_api = ZoomAPI(ZOOM_CONFIG, http_pool, response_cache, outbound_scheduler)
+
+# Coalesces concurrent token refreshes for the same user
+token_refresh_flights = SingleFlight()
+
+@app.get("/")
+async def root():
+    """Root endpoint with basic information"""
+    return {
+        "message": "Zoom Recordings API",
+        "auth_endpoint": "/oauth/login",
+        "recordings_endpoint": "/recordings"
+    }
+
+@app.get("/oauth/login")
+async def oauth_login():
+    """Initiate OAuth flow"""
+    # Generate a random state for security
+    state = secrets.token_urlsafe(32)
+    oauth_states.add(state)
+    # The callback may be served by another worker
+    await oauth_states.flush()
+    
+    auth_url = zoom_oauth.get_auth_url(state)
+    
+    return {
+        "auth_url": auth_url,
+        "message": "Visit the auth_url to authorize the application"
+    }
+
+@app.get("/oauth/login-simple")
+async def oauth_login_simple():
+    """Initiate OAuth flow without state (for testing)"""
+    # Construct URL manually without encoding
+    client_id = ZOOM_CONFIG["client_id"]
+    redirect_uri = ZOOM_CONFIG["redirect_uri"]
+    
+    # Build exact URL format without urlencode
+    auth_url = f"{ZOOM_CONFIG['auth_url']}?response_type=code&client_id={client_id}&redirect_uri={redirect_uri}"
+    
+    logger.info(f"Generated auth URL with client_id: {client_id}")
+    logger.info(f"Complete auth URL: {auth_url}")
+    
+    return {
+        "auth_url": auth_url,
+        "message": "Visit the auth_url to authorize the application (simplified version)"
+    }
+
+# Frontend that receives users after the OAuth popup closes
+FRONTEND_URL = "https://qtubechat-1731d.firebaseapp.com"  # Replace with your actual frontend URL
+
+def escape_js_string(value: str) -> str:
+    """Escape text for a quoted JS string literal inside a <script> block"""
+    escaped = json.dumps(value)[1:-1]  # Handles backslashes, quotes, control chars, U+2028/9
+    return (escaped.replace("'", "\\u0027").replace("<", "\\u003c")
+            .replace(">", "\\u003e").replace("&", "\\u0026"))
+
+TEMPLATE_ESCAPERS = {
+    "html": lambda value: html.escape(value, quote=True),
+    "js": escape_js_string,
+    "url": lambda value: quote(value, safe=""),
+}
+
+class HTMLTemplate:
+    """Page template parsed once into static fragments and escaped placeholders
+
+    Placeholders look like {{html:name}}, {{js:name}} or {{url:name}} and
+    are escaped for the HTML, JS-string or URL query-value context they
+    appear in. bind() resolves some placeholders ahead of time; a template
+    with none left is rendered once and served with an ETag.
+    """
+
+    _PLACEHOLDER = re.compile(r"\{\{(html|js|url):(\w+)\}\}")
+
+    def __init__(self, source: str, **bound):
+        self._fragments = []  # Static text; len(fields) + 1 entries
+        self._fields = []  # (escaper, name) between fragments
+        
+        text, pos = [], 0
+        for match in self._PLACEHOLDER.finditer(source):
+            text.append(source[pos:match.start()])
+            escape = TEMPLATE_ESCAPERS[match.group(1)]
+            name = match.group(2)
+            if name in bound:
+                text.append(escape(str(bound[name])))
+            else:
+                self._fragments.append("".join(text))
+                self._fields.append((escape, name))
+                text = []
+            pos = match.end()
+        text.append(source[pos:])
+        self._fragments.append("".join(text))
+        
+        self._source = source
+        self._bound = bound
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        if not self._fields:
+            self.body = self._fragments[0].encode()
+            # Weak: the gzip and identity encodings share it
+            self.etag = 'W/"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+    
+    def bind(self, **context) -> "HTMLTemplate":
+        """New template with some placeholders resolved into static text"""
+        return HTMLTemplate(self._source, **self._bound, **context)
+    
+    def render(self, **context) -> str:
+        """Fill the remaining placeholders"""
+        out = [self._fragments[0]]
+        for (escape, name), fragment in zip(self._fields, self._fragments[1:]):
+            out.append(escape(str(context[name])))
+            out.append(fragment)
+        return "".join(out)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak If-None-Match comparison against one ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates
+    )
+
+def html_page(request: Request, template: HTMLTemplate, **context) -> Response:
+    """Render a page; fully static pages are served with ETag and caching headers"""
+    if template.body is None:
+        return HTMLResponse(
+            content=template.render(**context),
+            headers={"Cache-Control": "no-store"}
+        )
+    
+    headers = {"ETag": template.etag, "Cache-Control": "public, max-age=300"}
+    if etag_matches(request.headers.get("if-none-match"), template.etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=template.body, headers=headers)
+
+AUTH_ERROR_TEMPLATE = HTMLTemplate("""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Authentication Failed</title>
+    <script>
+        if (window.opener) {
+            window.opener.postMessage({
+                type: 'ZOOM_AUTH_ERROR',
+                error: '{{js:message}}'
+            }, '*');
+            setTimeout(() => window.close(), 1000);
+        } else {
+            window.location.href = "{{js:frontend_url}}?error={{url:error_code}}";
+        }
+    </script>
+</head>
+<body>
+    <h3>Authentication failed: {{html:message}}</h3>
+    <p>This window will close automatically...</p>
+</body>
+</html>
+""", frontend_url=FRONTEND_URL)
+
+AUTH_SUCCESS_TEMPLATE = HTMLTemplate("""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Authentication Successful</title>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            text-align: center;
+            padding: 50px;
+        }
+        .success {
+            color: #28a745;
+            font-size: 24px;
+            margin-bottom: 20px;
+        }
+    </style>
+    <script>
+        console.log("Auth successful, sending message to parent");
+        
+        function sendMessage() {
+            if (window.opener) {
+                try {
+                    window.opener.postMessage({
+                        type: 'ZOOM_AUTH_SUCCESS',
+                        userId: '{{js:user_id}}',
+                        userEmail: '{{js:user_email}}',
+                        userName: '{{js:user_name}}'
+                    }, '*');
+                    console.log("Message sent to parent window");
+                    
+                    // Also set localStorage directly if possible
+                    try {
+                        window.opener.localStorage.setItem('zoom_user_id', '{{js:user_id}}');
+                    } catch(e) {
+                        console.log("Couldn't set localStorage directly");
+                    }
+                    
+                    setTimeout(() => window.close(), 2000);
+                } catch(e) {
+                    console.error("Error sending message:", e);
+                    document.getElementById('manual').style.display = 'block';
+                }
+            } else {
+                console.log("No opener found");
+                document.getElementById('manual').style.display = 'block';
+            }
+        }
+        
+        // Try immediately and then retry after a short delay
+        sendMessage();
+        setTimeout(sendMessage, 500);
+        
+        // Close window after 5 seconds regardless
+        setTimeout(() => {
+            window.close();
+        }, 5000);
+    </script>
+</head>
+<body>
+    <div class="success">✅ Authentication Successful!</div>
+    <p>Welcome, {{html:user_name}}!</p>
+    <p>User ID: {{html:user_id}}</p>
+    <p>This window will close automatically...</p>
+    
+    <div id="manual" style="display: none; margin-top: 20px;">
+        <p>If the window doesn't close automatically:</p>
+        <button onclick="window.close()">Close Window</button>
+        <p>Or return to the app:</p>
+        <a href="{{html:frontend_url}}?zoom_user_id={{url:user_id}}" target="_top">Return to App</a>
+    </div>
+</body>
+</html>
+""", frontend_url=FRONTEND_URL)
+
+# Error pages with fixed text are rendered once at startup
+MISSING_CODE_PAGE = AUTH_ERROR_TEMPLATE.bind(
+    message="Missing authorization code", error_code="missing_code"
+)
+INVALID_STATE_PAGE = AUTH_ERROR_TEMPLATE.bind(
+    message="Invalid state parameter", error_code="invalid_state"
+)
+
+@app.get("/oauth/callback")
+async def oauth_callback(request: Request):
+    """Handle OAuth callback"""
+    query_params = dict(request.query_params)
+    
+    code = query_params.get("code")
+    state = query_params.get("state")
+    error = query_params.get("error")
+    
+    logger.info(f"OAuth callback received - Code: {code}, State: {state}, Error: {error}")
+    
+    if error:
+        # Return HTML that communicates error to parent window
+        return html_page(request, AUTH_ERROR_TEMPLATE, message=error, error_code=error)
+    
+    if not code:
+        # Return HTML that communicates error to parent window
+        return html_page(request, MISSING_CODE_PAGE)
+    
+    # Verify state to prevent CSRF attacks (if provided)
+    if state:
+        # Consuming removes the state, whether valid, expired or unknown
+        if not oauth_states.consume(state):
+            return html_page(request, INVALID_STATE_PAGE)
+    else:
+        logger.warning("No state parameter received in callback")
+    
+    try:
+        # Log request details for debugging
+        logger.info(f"Exchanging code for token with redirect_uri: {ZOOM_CONFIG['redirect_uri']}")
+        logger.info(f"Using client_id: {ZOOM_CONFIG['client_id']}")
+        
+        # Exchange code for tokens
+        token_data = await zoom_oauth.exchange_code_for_token(code)
+        
+        # Get user info
+        user_info = await zoom_api.get_user_info(token_data["access_token"])
+        user_id = user_info["id"]
+        
+        # Store tokens (in production, use secure database)
+        user_tokens[user_id] = {
+            "access_token": token_data["access_token"],
+            "refresh_token": token_data["refresh_token"],
+            "expires_in": token_data["expires_in"],
+            "issued_at": time.time(),
+            "user_info": user_info
+        }
+        token_refresher.schedule(user_id, user_tokens[user_id])
+        # Visible to every worker before the page tells the frontend to use it
+        await user_tokens.flush()
+        
+        # Return HTML that communicates success to parent window
+        user_name = f'{user_info.get("first_name", "")} {user_info.get("last_name", "")}'
+        return html_page(
+            request, AUTH_SUCCESS_TEMPLATE,
+            user_id=user_id,
+            user_email=user_info.get("email", ""),
+            user_name=user_name
+        )
+        
+    except Exception as e:
+        logger.error(f"OAuth callback exception: {str(e)}")
+        return html_page(request, AUTH_ERROR_TEMPLATE, message=str(e), error_code=str(e))
+    
+async def _refresh_user_token(user_id: str, expired_access_token: str, trigger: str) -> str:
+    """Refresh a user's tokens with Zoom and store the result"""
+    # Only one worker may spend the refresh token; the others wait for its result
+    async with worker_coordinator.lease(f"token-refresh:{user_id}"):
+        user_tokens.invalidate(user_id)
+        token_info = user_tokens[user_id]
+        if token_info["access_token"] != expired_access_token:
+            token_refresher.schedule(user_id, token_info)
+            return token_info["access_token"]
+        
+        refresh_token = token_info["refresh_token"]
+        ZOOM_TOKEN_REFRESHES.inc(trigger)
+        new_token_data = await zoom_oauth.refresh_token(refresh_token)
+        
+        # Update stored tokens (replace the entry so persistent stores see it)
+        user_tokens[user_id] = {
+            **user_tokens[user_id],
+            "access_token": new_token_data["access_token"],
+            "refresh_token": new_token_data.get("refresh_token", refresh_token),
+            "expires_in": new_token_data["expires_in"],
+            "issued_at": time.time()
+        }
+        # Written before the lease is released so waiting workers read the new token
+        await user_tokens.flush()
+    
+    response_cache.invalidate_user(user_id)
+    token_refresher.schedule(user_id, user_tokens[user_id])
+    return new_token_data["access_token"]
+
+async def refresh_user_token(user_id: str, expired_access_token: str, trigger: str) -> str:
+    """Refresh a user's token once, however many callers saw it expire
+
+    trigger ("401" or "proactive") labels the refresh in the metrics when
+    this call is the one that reaches Zoom.
+    """
+    # Zoom revokes the refresh token that loses a concurrent refresh race,
+    # so callers holding an already replaced token just pick up the new one
+    current_access_token = user_tokens[user_id]["access_token"]
+    if current_access_token != expired_access_token:
+        return current_access_token
+    
+    return await token_refresh_flights.do(
+        ("refresh", user_id), lambda: _refresh_user_token(user_id, expired_access_token, trigger)
+    )
+
+class TokenRefreshScheduler:
+    """Background task that refreshes access tokens shortly before they expire"""
+
+    def __init__(self, config):
+        self.config = config
+        self._heap = []  # (due_at, user_id); entries not matching _due are stale
+        self._due = {}  # user_id -> current due_at
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._refreshes = set()
+        self.refreshed = 0
+        self.failed = 0
+    
+    def schedule(self, user_id: str, token_info: dict):
+        """(Re)schedule a proactive refresh from the token's issue time and lifetime"""
+        expires_at = token_info.get("issued_at", time.time()) + token_info["expires_in"]
+        lead = self.config["refresh_before"] + random.uniform(0, self.config["jitter"])
+        self._push(user_id, expires_at - lead)
+    
+    def unschedule(self, user_id: str):
+        """Stop refreshing a user's token (the heap entry is skipped lazily)"""
+        self._due.pop(user_id, None)
+    
+    def token_changed(self, user_id: str):
+        """Follow a login, refresh or logout made by another worker"""
+        token_info = user_tokens.get(user_id)
+        if token_info is None:
+            self.unschedule(user_id)
+        else:
+            self.schedule(user_id, token_info)
+    
+    def _push(self, user_id: str, due_at: float):
+        self._due[user_id] = due_at
+        heapq.heappush(self._heap, (due_at, user_id))
+        self._wakeup.set()
+    
+    def start(self):
+        """Start the scheduler loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Cancel the scheduler loop and any running refreshes"""
+        tasks = list(self._refreshes)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _run(self):
+        semaphore = asyncio.Semaphore(self.config["max_concurrency"])
+        while True:
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                due_at, user_id = heapq.heappop(self._heap)
+                if self._due.get(user_id) != due_at:
+                    continue
+                del self._due[user_id]
+                task = asyncio.create_task(self._refresh(user_id, semaphore))
+                self._refreshes.add(task)
+                task.add_done_callback(self._refreshes.discard)
+            
+            timeout = self._heap[0][0] - now if self._heap else None
+            self._wakeup.clear()
+            await wait_event(self._wakeup, timeout)
+    
+    async def _refresh(self, user_id: str, semaphore: asyncio.Semaphore):
+        outbound_priority.set(PRIORITY_BACKGROUND)
+        async with semaphore:
+            token_info = user_tokens.get(user_id)
+            if token_info is None:
+                return
+            
+            try:
+                # Goes through the same single-flight as request-path refreshes
+                await refresh_user_token(user_id, token_info["access_token"], "proactive")
+                self.refreshed += 1
+                logger.info(f"Proactively refreshed token for user {user_id}")
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Proactive token refresh failed for user {user_id}: {e}")
+                expires_at = token_info.get("issued_at", 0) + token_info["expires_in"]
+                retry_at = time.time() + self.config["retry_delay"]
+                if user_id in user_tokens and retry_at < expires_at:
+                    self._push(user_id, retry_at)
+    
+    def stats(self) -> dict:
+        """Scheduler counters"""
+        next_due = min(self._due.values(), default=None)
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "scheduled": len(self._due),
+            "in_progress": len(self._refreshes),
+            "next_refresh_in": None if next_due is None else round(next_due - time.time(), 1),
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+        }
+
+# Initialize proactive token refresher
+token_refresher = TokenRefreshScheduler(TOKEN_REFRESH_CONFIG)
+worker_coordinator.subscribe("user_tokens", token_refresher.token_changed)
+
+async def call_with_token_refresh(user_id: str, call):
+    """Run call(access_token) for a user, refreshing the token once on 401"""
+    access_token = user_tokens[user_id]["access_token"]
+    
+    try:
+        return await call(access_token)
+        
+    except HTTPException as e:
+        if e.status_code != 401:
+            raise e
+        
+        # Try to refresh token
+        try:
+            new_access_token = await refresh_user_token(user_id, access_token, "401")
+            
+            # Retry the request with new token
+            return await call(new_access_token)
+            
+        except Exception as refresh_error:
+            raise HTTPException(
+                status_code=401, 
+                detail="Token expired and refresh failed. Please re-authenticate."
+            )
+
+async def ndjson_lines(items, fields: Optional[dict] = None):
+    """Encode an async iterable of dicts as newline-delimited JSON"""
+    try:
+        async for item in items:
+            yield dumps_json(project_fields(item, fields)) + b"\n"
+    except HTTPException as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error(f"Streaming failed: {e.detail}")
+        yield dumps_json({"error": e.detail, "status_code": e.status_code}) + b"\n"
+    except Exception as e:
+        logger.error(f"Streaming failed: {e}")
+        yield dumps_json({"error": str(e), "status_code": 500}) + b"\n"
+
+def parse_fields(fields: Optional[str]) -> Optional[dict]:
+    """Turn "topic,recording_files.download_url" into a projection tree"""
+    if not fields:
+        return None
+    tree = {}
+    for path in fields.split(","):
+        node = tree
+        for name in path.strip().split("."):
+            if name:
+                node = node.setdefault(name, {})
+    return tree or None
+
+def project_fields(value, tree: Optional[dict]):
+    """Keep only the fields in a projection tree; lists are projected per item"""
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [project_fields(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {name: project_fields(value[name], sub) for name, sub in tree.items() if name in value}
+    return value
+
+def project_meetings(recordings: dict, tree: Optional[dict]) -> dict:
+    """Apply a projection to each meeting, keeping the paging envelope"""
+    if not tree:
+        return recordings
+    return {**recordings, "meetings": project_fields(recordings.get("meetings", []), tree)}
+
+def conditional_json(request: Request, payload, cache_control: str) -> Response:
+    """JSON response with a content-hash ETag; a matching If-None-Match gets 304
+
+    The ETag is weak because the identity, gzip and br encodings all carry it.
+    """
+    body = dumps_json(payload)
+    etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    # Brotli is applied here; gzip is left to the middleware
+    accept_encoding = request.headers.get("accept-encoding", "")
+    if brotli is not None and "br" in accept_encoding and len(body) >= COMPRESSION_CONFIG["min_size"]:
+        body = brotli.compress(body, quality=COMPRESSION_CONFIG["brotli_quality"])
+        headers["Content-Encoding"] = "br"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def recording_windows(from_date: Optional[str], to_date: Optional[str]) -> Optional[list]:
+    """Zoom-sized windows covering a range, or None for Zoom's default range
+
+    Ranges longer than max_range_days are rejected with a 400.
+    """
+    if not from_date:
+        return None
+    to_date = to_date or date.today().isoformat()
+    windows = split_date_range(from_date, to_date, RECORDINGS_CONFIG["window_days"])
+    max_days = RECORDINGS_CONFIG["max_range_days"]
+    if (date.fromisoformat(to_date) - date.fromisoformat(from_date)).days >= max_days:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range must not exceed {max_days} days; "
+                   "use /jobs/recordings-history for longer ranges"
+        )
+    return windows
+
+async def fetch_user_recordings(user_id: str, from_date: Optional[str],
+                                to_date: Optional[str]) -> dict:
+    """Fetch every page of a user's recordings, fanning long ranges out over windows"""
+    windows = recording_windows(from_date, to_date) or [(from_date, to_date)]
+    return await call_with_token_refresh(
+        user_id,
+        lambda access_token: zoom_api.get_user_recordings_range(
+            access_token, user_id, windows
+        )
+    )
+
+class RecordingsIndex:
+    """Per-user recording metadata in SQLite, queried locally"""
+
+    SORT_COLUMNS = {"start_time", "duration", "total_size", "topic"}
+
+    def __init__(self, config):
+        self.config = config
+        self._db: Optional[SQLiteDatabase] = None
+    
+    @property
+    def db(self) -> SQLiteDatabase:
+        """Database, opened and migrated on first use"""
+        if self._db is None:
+            db = open_sqlite(self.config["sqlite_path"])
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS recordings ("
+                "user_id TEXT NOT NULL, uuid TEXT NOT NULL, meeting_id TEXT, "
+                "topic TEXT, start_time TEXT, duration INTEGER, total_size INTEGER, "
+                "recording_count INTEGER, file_types TEXT, payload TEXT NOT NULL, "
+                "PRIMARY KEY (user_id, uuid))"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS recordings_user_start "
+                "ON recordings (user_id, start_time)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS recordings_sync ("
+                "user_id TEXT PRIMARY KEY, watermark TEXT NOT NULL, synced_at REAL NOT NULL)"
+            )
+            self._db = db
+        return self._db
+    
+    @staticmethod
+    def _upsert_statement(user_id: str, meeting: dict) -> tuple:
+        files = meeting.get("recording_files", [])
+        file_types = sorted({f.get("file_type", "") for f in files} - {""})
+        return (
+            "INSERT OR REPLACE INTO recordings (user_id, uuid, meeting_id, topic, "
+            "start_time, duration, total_size, recording_count, file_types, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                user_id, meeting.get("uuid") or str(meeting.get("id")),
+                str(meeting.get("id", "")), meeting.get("topic", ""),
+                meeting.get("start_time", ""), meeting.get("duration", 0),
+                meeting.get("total_size", sum(f.get("file_size", 0) for f in files)),
+                meeting.get("recording_count", len(files)),
+                ",".join(file_types), json.dumps(meeting)
+            )
+        )
+    
+    async def upsert(self, user_id: str, meetings: list):
+        """Insert or replace meetings for a user"""
+        statements = [self._upsert_statement(user_id, meeting) for meeting in meetings]
+        if statements:
+            await asyncio.to_thread(self.db.executemany, statements)
+    
+    async def update(self, user_id: str, changes: dict):
+        """Rewrite indexed meetings in place
+
+        changes maps a meeting UUID to functions applied in order, each
+        taking the meeting and returning the new one, or None to delete it.
+        Meetings that are not indexed are left alone.
+        """
+        uuids = list(changes)
+        placeholders = ",".join("?" * len(uuids))
+        rows = await asyncio.to_thread(
+            self.db.execute,
+            f"SELECT uuid, payload FROM recordings WHERE user_id = ? AND uuid IN ({placeholders})",
+            [user_id] + uuids
+        )
+        statements = []
+        for uuid, payload in rows:
+            meeting = json.loads(payload)
+            for change in changes[uuid]:
+                meeting = change(meeting)
+                if meeting is None:
+                    break
+            if meeting is None:
+                statements.append((
+                    "DELETE FROM recordings WHERE user_id = ? AND uuid = ?", (user_id, uuid)
+                ))
+            else:
+                statements.append(self._upsert_statement(user_id, meeting))
+        if statements:
+            await asyncio.to_thread(self.db.executemany, statements)
+    
+    async def delete(self, user_id: str, uuids: Optional[list] = None):
+        """Delete some meetings for a user, or all of them"""
+        if uuids is None:
+            statements = [
+                ("DELETE FROM recordings WHERE user_id = ?", (user_id,)),
+                ("DELETE FROM recordings_sync WHERE user_id = ?", (user_id,)),
+            ]
+        else:
+            statements = [
+                ("DELETE FROM recordings WHERE user_id = ? AND uuid = ?", (user_id, uuid))
+                for uuid in uuids
+            ]
+        await asyncio.to_thread(self.db.executemany, statements)
+    
+    async def watermark(self, user_id: str) -> Optional[tuple]:
+        """(watermark date, synced_at) of the user's last sync"""
+        rows = await asyncio.to_thread(
+            self.db.execute,
+            "SELECT watermark, synced_at FROM recordings_sync WHERE user_id = ?",
+            (user_id,)
+        )
+        return rows[0] if rows else None
+    
+    async def set_watermark(self, user_id: str, watermark: str):
+        await asyncio.to_thread(
+            self.db.execute,
+            "INSERT OR REPLACE INTO recordings_sync (user_id, watermark, synced_at) "
+            "VALUES (?, ?, ?)",
+            (user_id, watermark, time.time())
+        )
+    
+    async def query(self, user_id: str, from_date: Optional[str] = None,
+                    to_date: Optional[str] = None, topic: Optional[str] = None,
+                    sort: str = "start_time", order: str = "desc",
+                    page_number: int = 1, page_size: int = 30) -> dict:
+        """Filter, sort and page a user's indexed recordings"""
+        if sort not in self.SORT_COLUMNS:
+            raise HTTPException(status_code=400, detail=f"sort must be one of {sorted(self.SORT_COLUMNS)}")
+        if order not in ("asc", "desc"):
+            raise HTTPException(status_code=400, detail="order must be asc or desc")
+        page_number = max(1, page_number)
+        page_size = min(max(1, page_size), ZOOM_MAX_PAGE_SIZE)
+        
+        where, params = ["user_id = ?"], [user_id]
+        if from_date:
+            where.append("start_time >= ?")
+            params.append(from_date)
+        if to_date:
+            try:
+                end = date.fromisoformat(to_date)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Dates must be in yyyy-mm-dd format")
+            # Inclusive end date against ISO timestamps
+            where.append("start_time < ?")
+            params.append((end + timedelta(days=1)).isoformat())
+        if topic:
+            where.append("topic LIKE ?")
+            params.append(f"%{topic}%")
+        clause = " AND ".join(where)
+        
+        def run():
+            total = self.db.execute(f"SELECT COUNT(*) FROM recordings WHERE {clause}", params)
+            rows = self.db.execute(
+                f"SELECT payload FROM recordings WHERE {clause} "
+                f"ORDER BY {sort} {order}, uuid LIMIT ? OFFSET ?",
+                params + [page_size, (page_number - 1) * page_size]
+            )
+            return total[0][0], rows
+        
+        total, rows = await asyncio.to_thread(run)
+        return {
+            "from": from_date,
+            "to": to_date,
+            "page_number": page_number,
+            "page_size": page_size,
+            "total_records": total,
+            "meetings": [json.loads(row[0]) for row in rows]
+        }
+
+class RecordingsSyncer:
+    """Keeps the recordings index current by fetching only the window since the last sync"""
+
+    def __init__(self, config, index: RecordingsIndex):
+        self.config = config
+        self.index = index
+        self.flights = SingleFlight()
+        self._task: Optional[asyncio.Task] = None
+        self.synced = 0
+        self.failed = 0
+    
+    async def sync_user(self, user_id: str) -> dict:
+        """Sync one user (concurrent calls for the same user share one sync)"""
+        return await self.flights.do(("sync", user_id), lambda: self._sync_user(user_id))
+    
+    async def _sync_user(self, user_id: str) -> dict:
+        outbound_priority.set(PRIORITY_BACKGROUND)
+        today = date.today()
+        previous = await self.index.watermark(user_id)
+        if previous is None:
+            start = today - timedelta(days=self.config["initial_days"])
+        else:
+            start = date.fromisoformat(previous[0]) - timedelta(days=self.config["overlap_days"])
+        
+        # Walk every page of every window, even for a short delta
+        windows = split_date_range(
+            start.isoformat(), today.isoformat(), RECORDINGS_CONFIG["window_days"]
+        )
+        recordings = await call_with_token_refresh(
+            user_id,
+            lambda access_token: zoom_api.get_user_recordings_range(
+                access_token, user_id, windows, use_cache=False
+            )
+        )
+        meetings = recordings.get("meetings", [])
+        await self.index.upsert(user_id, meetings)
+        await self.index.set_watermark(user_id, today.isoformat())
+        self.synced += 1
+        return {"user_id": user_id, "from": start.isoformat(), "to": today.isoformat(),
+                "meetings": len(meetings)}
+    
+    def start(self):
+        """Start periodic background syncing"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    async def _run(self):
+        semaphore = asyncio.Semaphore(self.config["sync_concurrency"])
+        
+        async def sync_one(user_id):
+            async with semaphore:
+                try:
+                    await self.sync_user(user_id)
+                except Exception as e:
+                    self.failed += 1
+                    logger.warning(f"Recordings sync failed for user {user_id}: {e}")
+        
+        while True:
+            # One worker syncs per interval; the lease lapses before the next round
+            if await worker_coordinator.acquire("recordings-sync", self.config["sync_interval"] * 0.9):
+                await asyncio.gather(*(sync_one(user_id) for user_id in list(user_tokens)))
+            await asyncio.sleep(self.config["sync_interval"])
+    
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "synced": self.synced,
+            "failed": self.failed,
+            "in_progress": self.flights.stats()["in_flight"],
+        }
+
+# Initialize recordings index and its background sync
+recordings_index = RecordingsIndex(RECORDINGS_INDEX_CONFIG)
+recordings_syncer = RecordingsSyncer(RECORDINGS_INDEX_CONFIG, recordings_index)
+
+# Webhook events that change a user's recordings
+RECORDING_UPSERT_EVENTS = {"recording.completed", "recording.recovered"}
+RECORDING_RENAME_EVENTS = {"recording.renamed"}  # Payload carries the meeting header only
+RECORDING_DELETE_EVENTS = {"recording.deleted", "recording.trashed"}  # Only the listed files
+RECORDING_EVENTS = RECORDING_UPSERT_EVENTS | RECORDING_RENAME_EVENTS | RECORDING_DELETE_EVENTS
+
+def rename_meeting(topic: str):
+    """RecordingsIndex.update change setting a meeting's topic"""
+    def change(meeting: dict) -> dict:
+        return {**meeting, "topic": topic}
+    return change
+
+def remove_recording_files(file_ids: Optional[set]):
+    """RecordingsIndex.update change dropping files; the meeting goes with its last file"""
+    def change(meeting: dict) -> Optional[dict]:
+        if file_ids is None:
+            return None
+        files = [f for f in meeting.get("recording_files", []) if f.get("id") not in file_ids]
+        if not files:
+            return None
+        return {
+            **meeting,
+            "recording_files": files,
+            "recording_count": len(files),
+            "total_size": sum(f.get("file_size", 0) for f in files),
+        }
+    return change
+
+class WebhookConsumer:
+    """Applies queued Zoom recording events to the index and cache in batches"""
+
+    def __init__(self, config, index: RecordingsIndex, cache: ResponseCache):
+        self.config = config
+        self.index = index
+        self.cache = cache
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=config["queue_size"])
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.applied = 0
+        self.dropped = 0
+        self.batches = 0
+    
+    def enqueue(self, event: dict) -> bool:
+        """Queue an event; False when the queue is full"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.received += 1
+        return True
+    
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            await asyncio.sleep(self.config["batch_window"])
+            while len(batch) < self.config["batch_size"] and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            
+            try:
+                await self.apply(batch)
+            except Exception as e:
+                logger.error(f"Failed to apply {len(batch)} webhook events: {e}")
+    
+    async def apply(self, events: list):
+        """Apply a batch of events, a few index writes per user
+
+        Full meetings from completed/recovered events are upserted. Renames
+        and trashed/deleted files are applied to the stored meeting, or to
+        a full meeting from earlier in the same batch.
+        """
+        upserts, changes = {}, {}
+        for event in events:
+            meeting = event.get("payload", {}).get("object", {})
+            user_id = meeting.get("host_id")
+            uuid = meeting.get("uuid")
+            if not user_id or not uuid:
+                continue
+            kind = event.get("event")
+            if kind in RECORDING_UPSERT_EVENTS:
+                change = None
+            elif kind in RECORDING_RENAME_EVENTS:
+                change = rename_meeting(meeting.get("topic", ""))
+            elif kind in RECORDING_DELETE_EVENTS:
+                file_ids = {f.get("id") for f in meeting.get("recording_files", [])} - {None}
+                change = remove_recording_files(file_ids or None)
+            else:
+                continue
+            
+            # Later events for the same meeting apply on top of earlier ones
+            user_upserts = upserts.setdefault(user_id, {})
+            user_changes = changes.setdefault(user_id, {})
+            if change is None:
+                user_changes.pop(uuid, None)
+                user_upserts[uuid] = meeting
+            elif uuid in user_upserts:
+                if user_upserts[uuid] is not None:
+                    user_upserts[uuid] = change(user_upserts[uuid])
+            else:
+                user_changes.setdefault(uuid, []).append(change)
+        
+        for user_id in set(upserts) | set(changes):
+            meetings = [m for m in upserts.get(user_id, {}).values() if m is not None]
+            removed = [uuid for uuid, m in upserts.get(user_id, {}).items() if m is None]
+            if meetings:
+                await self.index.upsert(user_id, meetings)
+            if removed:
+                await self.index.delete(user_id, removed)
+            if changes.get(user_id):
+                await self.index.update(user_id, changes[user_id])
+            self.cache.invalidate_user(user_id)
+        
+        self.applied += len(events)
+        self.batches += 1
+    
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "queued": self.queue.qsize(),
+            "received": self.received,
+            "applied": self.applied,
+            "dropped": self.dropped,
+            "batches": self.batches,
+        }
+
+# Initialize webhook consumer
+webhook_consumer = WebhookConsumer(WEBHOOK_CONFIG, recordings_index, response_cache)
+
+def zoom_webhook_signature(secret: str, message: bytes) -> str:
+    """Hex HMAC-SHA256 as used by Zoom webhook signatures"""
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+@app.post("/webhooks/zoom")
+async def zoom_webhook(request: Request):
+    """Receive Zoom event notifications"""
+    secret = ZOOM_CONFIG["webhook_secret_token"]
+    if not secret:
+        raise HTTPException(status_code=503, detail="Webhook secret token is not configured")
+    
+    # Sign and compare raw bytes: the body need not be valid UTF-8 and the
+    # headers need not be ASCII until the request is known to be from Zoom
+    body = await request.body()
+    timestamp = request.headers.get("x-zm-request-timestamp", "").encode("latin-1")
+    signature = request.headers.get("x-zm-signature", "").encode("latin-1")
+    
+    expected = "v0=" + zoom_webhook_signature(secret, b"v0:" + timestamp + b":" + body)
+    if not hmac.compare_digest(signature, expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    try:
+        skew = abs(time.time() - int(timestamp))
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid webhook timestamp")
+    if skew > WEBHOOK_CONFIG["max_clock_skew"]:
+        raise HTTPException(status_code=401, detail="Stale webhook timestamp")
+    
+    try:
+        event = json.loads(body)
+    except ValueError:  # Includes bodies that are not UTF-8
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(event, dict):
+        raise HTTPException(status_code=400, detail="Webhook body must be a JSON object")
+    
+    if event.get("event") == "endpoint.url_validation":
+        plain_token = (event.get("payload") or {}).get("plainToken", "")
+        if not isinstance(plain_token, str):
+            raise HTTPException(status_code=400, detail="plainToken must be a string")
+        return {
+            "plainToken": plain_token,
+            "encryptedToken": zoom_webhook_signature(secret, plain_token.encode())
+        }
+    
+    if event.get("event") in RECORDING_EVENTS:
+        if not webhook_consumer.enqueue(event):
+            raise HTTPException(status_code=503, detail="Webhook queue is full")
+    
+    return {"status": "accepted"}
+
+@app.get("/recordings")
+async def get_recordings(request: Request, user_id: str, from_date: Optional[str] = None, 
+                        to_date: Optional[str] = None, stream: bool = False,
+                        timeout: Optional[float] = None, source: str = "zoom",
+                        topic: Optional[str] = None, sort: str = "start_time",
+                        order: str = "desc", page_number: int = 1,
+                        page_size: int = 30, fields: Optional[str] = None):
+    """Get user recordings (stream=true walks every page and returns NDJSON)
+
+    timeout bounds, in seconds, how long Zoom calls may wait on rate limits.
+    source=index answers from the local recordings index instead of Zoom,
+    with topic filtering, sorting and paging done locally.
+    fields (e.g. "topic,start_time,recording_files.download_url") limits
+    each meeting to the listed fields.
+    """
+    projection = parse_fields(fields)
+    if user_id not in user_tokens:
+        raise HTTPException(
+            status_code=401, 
+            detail="User not authenticated. Please visit /oauth/login first."
+        )
+    
+    if source == "index":
+        if from_date or to_date:
+            # Validate either bound on its own before any sync
+            split_date_range(from_date or to_date, to_date or date.today().isoformat(), 1)
+        # A user that was never synced is synced once before answering
+        synced = await recordings_index.watermark(user_id)
+        if synced is None:
+            with outbound_context(timeout=timeout):
+                await recordings_syncer.sync_user(user_id)
+            synced = await recordings_index.watermark(user_id)
+        result = await recordings_index.query(
+            user_id, from_date, to_date, topic, sort, order, page_number, page_size
+        )
+        result["synced_at"] = synced[1]
+        return conditional_json(request, project_meetings(result, projection), RECORDINGS_CACHE_CONTROL)
+    elif source != "zoom":
+        raise HTTPException(status_code=400, detail="source must be zoom or index")
+    
+    if not stream:
+        with outbound_context(timeout=timeout):
+            recordings = await fetch_user_recordings(user_id, from_date, to_date)
+        return conditional_json(request, project_meetings(recordings, projection), RECORDINGS_CACHE_CONTROL)
+    
+    # Fetch the first page up front so auth errors still get a proper status
+    windows = recording_windows(from_date, to_date)
+    first_from, first_to = windows[-1] if windows else (from_date, to_date)
+    with outbound_context(timeout=timeout):
+        first_page = await call_with_token_refresh(
+            user_id,
+            lambda access_token: zoom_api.get_user_recordings(
+                access_token, user_id, first_from, first_to, page_size=ZOOM_MAX_PAGE_SIZE,
+                use_cache=False
+            )
+        )
+    
+    # A full walk, so none of it goes through the response cache
+    access_token = user_tokens[user_id]["access_token"]
+    if windows:
+        meetings = zoom_api.iter_user_recordings_range(
+            access_token, user_id, windows, first_page=first_page, use_cache=False
+        )
+    else:
+        meetings = zoom_api.iter_user_recordings(
+            access_token, user_id, from_date, to_date, first_page=first_page, use_cache=False
+        )
+    return StreamingResponse(ndjson_lines(meetings, projection), media_type="application/x-ndjson")
+
+class UpstreamStreamingResponse(StreamingResponse):
+    """Streams an upstream httpx response and always closes it
+
+    Closing happens when sending ends for any reason, including a client
+    that disconnects or a send that fails before the body is iterated.
+    """
+
+    def __init__(self, upstream: "httpx.Response", chunk_size: int, **kwargs):
+        self.upstream = upstream
+        # Each chunk is read only after the previous one was sent (backpressure)
+        super().__init__(upstream.aiter_bytes(chunk_size), status_code=upstream.status_code, **kwargs)
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.upstream.aclose()
+
+@app.get("/recordings/{meeting_id:path}/files/{file_id}")
+async def download_recording_file(meeting_id: str, file_id: str, user_id: str,
+                                  request: Request):
+    """Stream a recording file through the service, passing through Range requests"""
+    if user_id not in user_tokens:
+        raise HTTPException(
+            status_code=401, 
+            detail="User not authenticated. Please visit /oauth/login first."
+        )
+    
+    meeting = await call_with_token_refresh(
+        user_id,
+        lambda access_token: zoom_api.get_meeting_recordings(access_token, user_id, meeting_id)
+    )
+    recording_file = next(
+        (f for f in meeting.get("recording_files", []) if f.get("id") == file_id), None
+    )
+    if recording_file is None or not recording_file.get("download_url"):
+        raise HTTPException(status_code=404, detail="Recording file not found")
+    
+    forward = {
+        name: request.headers[name]
+        for name in ("range", "if-range", "if-none-match")
+        if name in request.headers
+    }
+    upstream = await call_with_token_refresh(
+        user_id,
+        lambda access_token: zoom_api.open_download(
+            access_token, recording_file["download_url"], forward
+        )
+    )
+    
+    headers = {
+        name: upstream.headers[name]
+        for name in DOWNLOAD_PASSTHROUGH_HEADERS
+        if name in upstream.headers
+    }
+    headers.setdefault("accept-ranges", "bytes")
+    return UpstreamStreamingResponse(
+        upstream, DOWNLOAD_CONFIG["chunk_size"], headers=headers,
+        media_type=upstream.headers.get("content-type", "application/octet-stream")
+    )
+
+class BatchRecordingsRequest(BaseModel):
+    user_ids: List[str]
+    from_date: Optional[str] = None
+    to_date: Optional[str] = None
+
+async def _batch_user_recordings(user_id: str, from_date: Optional[str],
+                                 to_date: Optional[str],
+                                 semaphore: asyncio.Semaphore) -> dict:
+    """One user's batch result; errors are reported instead of raised"""
+    outbound_priority.set(PRIORITY_BACKGROUND)
+    async with semaphore:
+        try:
+            if user_id not in user_tokens:
+                raise HTTPException(status_code=401, detail="User not authenticated")
+            recordings = await fetch_user_recordings(user_id, from_date, to_date)
+            return {"user_id": user_id, "status_code": 200, "recordings": recordings}
+        except HTTPException as e:
+            return {"user_id": user_id, "status_code": e.status_code, "error": e.detail}
+        except Exception as e:
+            logger.error(f"Batch recordings failed for user {user_id}: {e}")
+            return {"user_id": user_id, "status_code": 500, "error": str(e)}
+
+@app.post("/recordings/batch")
+async def get_recordings_batch(batch: BatchRecordingsRequest):
+    """Fetch recordings for many users concurrently, streaming NDJSON as each finishes"""
+    user_ids = list(dict.fromkeys(batch.user_ids))
+    if len(user_ids) > BATCH_CONFIG["max_users"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BATCH_CONFIG['max_users']} users per batch"
+        )
+    # Reject a bad date range for the whole batch before streaming starts
+    recording_windows(batch.from_date, batch.to_date)
+    
+    async def results():
+        semaphore = asyncio.Semaphore(BATCH_CONFIG["concurrency"])
+        tasks = [
+            asyncio.create_task(_batch_user_recordings(
+                user_id, batch.from_date, batch.to_date, semaphore
+            ))
+            for user_id in user_ids
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(ndjson_lines(results()), media_type="application/x-ndjson")
+
+def _pwrite(fd: int, data: bytes, offset: int, lock: threading.Lock):
+    """Positional write; falls back to seek + write where os.pwrite is missing"""
+    if hasattr(os, "pwrite"):
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+        return
+    with lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+
+def _preallocate(fd: int, size: int):
+    """Reserve a file's full size up front"""
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            pass  # Not supported by this filesystem
+    os.ftruncate(fd, size)
+
+def _safe_filename(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]", "_", value) or "_"
+
+class ArchiveJob:
+    """Progress of one archive run"""
+
+    def __init__(self, job_id: str, user_ids: list, from_date: Optional[str], to_date: Optional[str]):
+        self.id = job_id
+        self.user_ids = user_ids
+        self.from_date = from_date
+        self.to_date = to_date
+        self.status = "pending"
+        self.files_total = 0
+        self.files_done = 0
+        self.files_skipped = 0
+        self.files_failed = 0
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.errors = []
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+    
+    def error(self, message: str):
+        logger.warning(f"Archive job {self.id}: {message}")
+        if len(self.errors) < ARCHIVE_CONFIG["max_errors"]:
+            self.errors.append(message)
+    
+    def progress(self) -> dict:
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "user_ids": self.user_ids,
+            "from_date": self.from_date,
+            "to_date": self.to_date,
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "files_skipped": self.files_skipped,
+            "files_failed": self.files_failed,
+            "bytes_total": self.bytes_total,
+            "bytes_done": self.bytes_done,
+            "elapsed_seconds": round(elapsed, 1),
+            "throughput_bytes_per_second": round(self.bytes_done / elapsed) if elapsed else 0,
+            "errors": self.errors,
         }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(self.token_url, headers=headers, data=data)
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Token refresh failed: {response.text}"
-                )
-            
-            return response.json()
 
-# Initialize OAuth handler
-zoom_oauth = ZoomOAuth(ZOOM_CONFIG)
+class RecordingArchiver:
+    """Downloads users' cloud recordings to disk with parallel ranged parts
+
+    Each file is preallocated as <name>.part and written with positional
+    writes. Finished parts are listed in a <name>.ckpt.json checkpoint, so
+    an interrupted run resumes where it stopped. Every part must deliver
+    its full byte range, and a file is renamed into place only once the
+    bytes received add up to what Zoom reported. Runs are scheduled
+    through the job queue.
+    """
 
-class ZoomAPI:
     def __init__(self, config):
         self.config = config
     
-    async def get_user_recordings(self, access_token: str, user_id: str = "me", 
-                                 from_date: Optional[str] = None, 
-                                 to_date: Optional[str] = None) -> dict:
-        """Fetch user recordings from Zoom API"""
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json"
-        }
+    async def run(self, job: ArchiveJob):
+        outbound_priority.set(PRIORITY_BACKGROUND)
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            files = []
+            for user_id in job.user_ids:
+                if user_id not in user_tokens:
+                    job.error(f"User {user_id} is not authenticated")
+                    continue
+                windows = split_date_range(
+                    job.from_date or (date.today() - timedelta(days=30)).isoformat(),
+                    job.to_date or date.today().isoformat(),
+                    RECORDINGS_CONFIG["window_days"]
+                )
+                recordings = await call_with_token_refresh(
+                    user_id,
+                    lambda access_token: zoom_api.get_user_recordings_range(
+                        access_token, user_id, windows, use_cache=False
+                    )
+                )
+                for meeting in recordings.get("meetings", []):
+                    for recording_file in meeting.get("recording_files", []):
+                        if recording_file.get("download_url"):
+                            files.append((user_id, meeting, recording_file))
+            
+            job.files_total = len(files)
+            job.bytes_total = sum(f.get("file_size", 0) for _, _, f in files)
+            
+            semaphore = asyncio.Semaphore(self.config["file_concurrency"])
+            
+            async def archive_one(user_id, meeting, recording_file):
+                async with semaphore:
+                    try:
+                        await self.archive_file(job, user_id, meeting, recording_file)
+                    except Exception as e:
+                        job.files_failed += 1
+                        job.error(f"{meeting.get('uuid')}/{recording_file.get('id')}: {e}")
+            
+            await asyncio.gather(*(archive_one(*f) for f in files))
+            job.status = "completed" if not job.files_failed else "completed_with_errors"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error(str(getattr(e, "detail", e)))
+        finally:
+            job.finished_at = time.time()
+    
+    def _target_path(self, user_id: str, meeting: dict, recording_file: dict) -> str:
+        extension = (recording_file.get("file_extension") or recording_file.get("file_type") or "bin").lower()
+        return os.path.join(
+            self.config["root"], _safe_filename(user_id),
+            _safe_filename(meeting.get("uuid") or str(meeting.get("id"))),
+            f"{_safe_filename(recording_file.get('id', 'file'))}.{_safe_filename(extension)}"
+        )
+    
+    async def archive_file(self, job: ArchiveJob, user_id: str, meeting: dict,
+                           recording_file: dict):
+        """Download one file, resuming from its checkpoint when present"""
+        path = self._target_path(user_id, meeting, recording_file)
+        size = recording_file.get("file_size") or 0
+        if os.path.exists(path) and (not size or os.path.getsize(path) == size):
+            job.files_skipped += 1
+            job.bytes_done += size
+            return
         
-        params = {
-            "page_size": 30,
-            "next_page_token": ""
-        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part_path = path + ".part"
+        checkpoint_path = path + ".ckpt.json"
+        part_size = self.config["part_size"]
         
-        if from_date:
-            params["from"] = from_date
-        if to_date:
-            params["to"] = to_date
+        parts = [(0, size - 1)] if size else [(0, None)]
+        if size > part_size:
+            parts = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
         
-        url = f"{self.config['base_url']}/users/{user_id}/recordings"
+        done = set()
+        if size and os.path.exists(part_path) and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint.get("size") == size and checkpoint.get("part_size") == part_size:
+                done = set(checkpoint.get("done", []))
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, params=params)
+        done &= set(range(len(parts)))
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        fd = os.open(part_path, flags, 0o644)
+        lock = threading.Lock()
+        # The preallocated size says nothing about what arrived, so count it
+        received = sum(parts[i][1] - parts[i][0] + 1 for i in done)
+        try:
+            if size and not done:
+                await asyncio.to_thread(_preallocate, fd, size)
+            elif not size:
+                os.ftruncate(fd, 0)
+            job.bytes_done += received
             
-            if response.status_code == 401:
-                raise HTTPException(status_code=401, detail="Access token expired")
-            elif response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code, 
-                    detail=f"API request failed: {response.text}"
-                )
+            semaphore = asyncio.Semaphore(self.config["part_concurrency"])
+            checkpoint_lock = asyncio.Lock()
             
-            return response.json()
-    
-    async def get_user_info(self, access_token: str) -> dict:
-        """Get user information"""
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json"
-        }
-        
-        url = f"{self.config['base_url']}/users/me"
+            async def fetch_part(index):
+                nonlocal received
+                async with semaphore:
+                    part_bytes = await self._download_part(
+                        job, user_id, recording_file["download_url"], fd, lock, parts[index]
+                    )
+                    received += part_bytes
+                    done.add(index)
+                    if size:
+                        # One writer at a time, each with a snapshot taken on the loop
+                        async with checkpoint_lock:
+                            await asyncio.to_thread(
+                                self._write_checkpoint, checkpoint_path, size, part_size, sorted(done)
+                            )
+            
+            tasks = [asyncio.create_task(fetch_part(i)) for i in range(len(parts)) if i not in done]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # One failed part stops its siblings before the descriptor closes
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            
+            await asyncio.to_thread(os.fsync, fd)
+        finally:
+            os.close(fd)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
+        if size and received != size:
+            raise ValueError(f"size mismatch: expected {size} bytes, received {received}")
+        os.replace(part_path, path)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        job.files_done += 1
+    
+    async def _download_part(self, job: ArchiveJob, user_id: str, download_url: str,
+                             fd: int, lock: threading.Lock, part: tuple) -> int:
+        """Write one byte range to the file and return how many bytes arrived
+
+        Raises if the stream ends before the end of the range.
+        """
+        start, end = part
+        headers = {"range": f"bytes={start}-{end}"} if end is not None else {}
+        upstream = await call_with_token_refresh(
+            user_id,
+            lambda access_token: zoom_api.open_download(access_token, download_url, headers)
+        )
+        offset = start
+        try:
+            if upstream.status_code not in (200, 206):
+                raise ValueError(f"unexpected download status {upstream.status_code}")
+            if upstream.status_code == 200 and start != 0:
+                raise ValueError("Zoom ignored the Range request")
             
-            if response.status_code == 401:
-                raise HTTPException(status_code=401, detail="Access token expired")
-            elif response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code, 
-                    detail=f"API request failed: {response.text}"
+            async for chunk in upstream.aiter_bytes(DOWNLOAD_CONFIG["chunk_size"]):
+                if end is not None and offset + len(chunk) > end + 1:
+                    # A 200 carries the whole file; keep only this part
+                    chunk = chunk[:end + 1 - offset]
+                await asyncio.to_thread(_pwrite, fd, chunk, offset, lock)
+                offset += len(chunk)
+                job.bytes_done += len(chunk)
+                if end is not None and offset > end:
+                    break
+            if end is not None and offset != end + 1:
+                raise ValueError(
+                    f"download truncated: got bytes {start}-{offset - 1} of {start}-{end}"
                 )
-            
-            return response.json()
+            return offset - start
+        except BaseException:
+            # The part is fetched again in full next time
+            job.bytes_done -= offset - start
+            raise
+        finally:
+            await upstream.aclose()
+    
+    @staticmethod
+    def _write_checkpoint(path: str, size: int, part_size: int, done: list):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"size": size, "part_size": part_size, "done": done}, f)
+        os.replace(tmp_path, path)
 
-# Initialize Zoom API handler
-zoom_api = ZoomAPI(ZOOM_CONFIG)
+# Initialize recording archiver
+recording_archiver = RecordingArchiver(ARCHIVE_CONFIG)
 
-@app.get("/")
-async def root():
-    """Root endpoint with basic information"""
-    return {
-        "message": "Zoom Recordings API",
-        "auth_endpoint": "/oauth/login",
-        "recordings_endpoint": "/recordings"
-    }
+class Job:
+    """One background job and its progress"""
 
-@app.get("/oauth/login")
-async def oauth_login():
-    """Initiate OAuth flow"""
-    # Generate a random state for security
-    state = secrets.token_urlsafe(32)
-    oauth_states[state] = True
-    
-    auth_url = zoom_oauth.get_auth_url(state)
-    
-    return {
-        "auth_url": auth_url,
-        "message": "Visit the auth_url to authorize the application"
-    }
+    TERMINAL = ("completed", "failed", "cancelled")
 
-@app.get("/oauth/login-simple")
-async def oauth_login_simple():
-    """Initiate OAuth flow without state (for testing)"""
-    # Construct URL manually without encoding
-    client_id = ZOOM_CONFIG["client_id"]
-    redirect_uri = ZOOM_CONFIG["redirect_uri"]
+    def __init__(self, kind: str, params: dict):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.progress = {}
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Event()  # Replaced after every change; waiters keep the old one
+        self.saved_at = 0.0
+        self.updated_at = self.created_at  # Wall clock of the last save, seen by other workers
     
-    # Build exact URL format without urlencode
-    auth_url = f"https://zoom.us/oauth/authorize?response_type=code&client_id={client_id}&redirect_uri={redirect_uri}"
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "updated_at": self.updated_at,
+            "expires_at": self.finished_at + JOB_CONFIG["result_ttl"] if self.finished_at else None,
+        }
+
+class JobQueue:
+    """Bounded pool of asyncio workers running submitted jobs
+
+    Status and results are kept in a token store namespace, so with the
+    SQLite backend any worker can answer a poll for a job another worker
+    is running. Finished jobs are dropped result_ttl after they end.
+    Unfinished jobs are saved every heartbeat_interval; one that stops
+    being saved belonged to a worker that died and is marked failed.
+    """
+
+    def __init__(self, config, store: TokenStore, coordinator: WorkerCoordinator):
+        self.config = config
+        self.store = store  # job_id -> status dict, "<job_id>/result" -> result
+        self.handlers = {}  # kind -> async handler(job, params) returning the result
+        self._queue = asyncio.Queue(config["queue_size"])
+        self._jobs = {}  # job_id -> Job, for jobs this worker accepted
+        self._tasks = []
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        coordinator.subscribe("job_cancel", self._cancel_local)
+        self.coordinator = coordinator
     
-    logger.info(f"Generated auth URL with client_id: {client_id}")
-    logger.info(f"Complete auth URL: {auth_url}")
+    def register(self, kind: str):
+        """Decorator registering the handler for a job kind"""
+        def decorator(handler):
+            self.handlers[kind] = handler
+            return handler
+        return decorator
     
-    return {
-        "auth_url": auth_url,
-        "message": "Visit the auth_url to authorize the application (simplified version)"
-    }
-
-@app.get("/oauth/callback")
-async def oauth_callback(request: Request):
-    """Handle OAuth callback"""
-    query_params = dict(request.query_params)
+    def submit(self, kind: str, params: dict) -> Job:
+        """Queue a job; params must already be validated"""
+        if kind not in self.handlers:
+            raise HTTPException(status_code=400, detail=f"Unknown job kind: {kind}")
+        job = Job(kind, params)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Job queue is full, try again later")
+        self._jobs[job.id] = job
+        self.submitted += 1
+        self._save(job)
+        return job
     
-    code = query_params.get("code")
-    state = query_params.get("state")
-    error = query_params.get("error")
+    def report(self, job: Job, **progress):
+        """Update a job's progress (persisted at most every progress_interval)"""
+        job.progress = {**job.progress, **progress}
+        self._notify(job)
+        if time.monotonic() - job.saved_at >= self.config["progress_interval"]:
+            self._save(job)
     
-    logger.info(f"OAuth callback received - Code: {code}, State: {state}, Error: {error}")
+    def _save(self, job: Job):
+        job.saved_at = time.monotonic()
+        job.updated_at = time.time()
+        self.store[job.id] = job.to_dict()
     
-    # Define the frontend URL for redirects if needed
-    FRONTEND_URL = "https://qtubechat-1731d.firebaseapp.com"  # Replace with your actual frontend URL
+    def _notify(self, job: Job):
+        changed, job.changed = job.changed, asyncio.Event()
+        changed.set()
     
-    if error:
-        # Return HTML that communicates error to parent window
-        error_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Authentication Failed</title>
-            <script>
-                if (window.opener) {{
-                    window.opener.postMessage({{
-                        type: 'ZOOM_AUTH_ERROR',
-                        error: '{error}'
-                    }}, '*');
-                    setTimeout(() => window.close(), 1000);
-                }} else {{
-                    window.location.href = "{FRONTEND_URL}?error={error}";
-                }}
-            </script>
-        </head>
-        <body>
-            <h3>Authentication failed: {error}</h3>
-            <p>This window will close automatically...</p>
-        </body>
-        </html>
-        """
-        from fastapi.responses import HTMLResponse
-        return HTMLResponse(content=error_html)
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status == "queued":
+                    job.task = asyncio.create_task(self._run(job))
+                    await asyncio.gather(job.task, return_exceptions=True)
+            finally:
+                self._queue.task_done()
     
-    if not code:
-        # Return HTML that communicates error to parent window
-        error_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Authentication Failed</title>
-            <script>
-                if (window.opener) {{
-                    window.opener.postMessage({{
-                        type: 'ZOOM_AUTH_ERROR',
-                        error: 'Missing authorization code'
-                    }}, '*');
-                    setTimeout(() => window.close(), 1000);
-                }} else {{
-                    window.location.href = "{FRONTEND_URL}?error=missing_code";
-                }}
-            </script>
-        </head>
-        <body>
-            <h3>Authentication failed: Missing authorization code</h3>
-            <p>This window will close automatically...</p>
-        </body>
-        </html>
-        """
-        from fastapi.responses import HTMLResponse
-        return HTMLResponse(content=error_html)
+    async def _run(self, job: Job):
+        outbound_priority.set(PRIORITY_BACKGROUND)
+        job.status = "running"
+        job.started_at = time.time()
+        self._save(job)
+        self._notify(job)
+        try:
+            result = await self.handlers[job.kind](job, job.params)
+            self.store[f"{job.id}/result"] = result
+            job.status = "completed"
+            self.completed += 1
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            self.cancelled += 1
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(getattr(e, "detail", e))
+            self.failed += 1
+            logger.error(f"Job {job.id} ({job.kind}) failed: {job.error}")
+        finally:
+            job.finished_at = time.time()
+            self._save(job)
+            self._notify(job)
     
-    # Verify state to prevent CSRF attacks (if provided)
-    if state:
-        if state not in oauth_states:
-            error_html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Authentication Failed</title>
-                <script>
-                    if (window.opener) {{
-                        window.opener.postMessage({{
-                            type: 'ZOOM_AUTH_ERROR',
-                            error: 'Invalid state parameter'
-                        }}, '*');
-                        setTimeout(() => window.close(), 1000);
-                    }} else {{
-                        window.location.href = "{FRONTEND_URL}?error=invalid_state";
-                    }}
-                </script>
-            </head>
-            <body>
-                <h3>Authentication failed: Invalid state parameter</h3>
-                <p>This window will close automatically...</p>
-            </body>
-            </html>
-            """
-            from fastapi.responses import HTMLResponse
-            return HTMLResponse(content=error_html)
-        # Remove used state
-        del oauth_states[state]
-    else:
-        logger.warning("No state parameter received in callback")
+    def get(self, job_id: str) -> Optional[dict]:
+        """Status of a job accepted by any worker, or None once unknown/expired"""
+        if "/" in job_id:
+            return None
+        job = self._jobs.get(job_id)
+        if job is not None:
+            info = job.to_dict()
+        else:
+            info = self.store.get(job_id)
+            if info is not None:
+                info = self._reclaim(info, self.config["orphan_after"])
+        if info is None:
+            return None
+        if info["expires_at"] is not None and info["expires_at"] <= time.time():
+            self._forget(job_id)
+            return None
+        return info
     
-    try:
-        # Log request details for debugging
-        logger.info(f"Exchanging code for token with redirect_uri: {ZOOM_CONFIG['redirect_uri']}")
-        logger.info(f"Using client_id: {ZOOM_CONFIG['client_id']}")
-        
-        # Exchange code for tokens
-        token_data = await zoom_oauth.exchange_code_for_token(code)
-        
-        # Get user info
-        user_info = await zoom_api.get_user_info(token_data["access_token"])
-        user_id = user_info["id"]
-        
-        # Store tokens (in production, use secure database)
-        user_tokens[user_id] = {
-            "access_token": token_data["access_token"],
-            "refresh_token": token_data["refresh_token"],
-            "expires_in": token_data["expires_in"],
-            "user_info": user_info
+    def _reclaim(self, info: dict, max_age: float) -> dict:
+        """Fail another worker's unfinished job once it has gone max_age unsaved"""
+        if info["status"] in Job.TERMINAL or info["job_id"] in self._jobs:
+            return info
+        now = time.time()
+        if now - info.get("updated_at", info["created_at"]) < max_age:
+            return info
+        info = {
+            **info,
+            "status": "failed",
+            "error": "The worker running this job stopped before it finished",
+            "finished_at": now,
+            "updated_at": now,
+            "expires_at": now + self.config["result_ttl"],
         }
-        
-        # Return HTML that communicates success to parent window
-        success_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Authentication Successful</title>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    text-align: center;
-                    padding: 50px;
-                }}
-                .success {{
-                    color: #28a745;
-                    font-size: 24px;
-                    margin-bottom: 20px;
-                }}
-            </style>
-            <script>
-                console.log("Auth successful, sending message to parent");
-                
-                function sendMessage() {{
-                    if (window.opener) {{
-                        try {{
-                            window.opener.postMessage({{
-                                type: 'ZOOM_AUTH_SUCCESS',
-                                userId: '{user_id}',
-                                userEmail: '{user_info.get("email", "")}',
-                                userName: '{user_info.get("first_name", "")} {user_info.get("last_name", "")}'
-                            }}, '*');
-                            console.log("Message sent to parent window");
-                            
-                            // Also set localStorage directly if possible
-                            try {{
-                                window.opener.localStorage.setItem('zoom_user_id', '{user_id}');
-                            }} catch(e) {{
-                                console.log("Couldn't set localStorage directly");
-                            }}
-                            
-                            setTimeout(() => window.close(), 2000);
-                        }} catch(e) {{
-                            console.error("Error sending message:", e);
-                            document.getElementById('manual').style.display = 'block';
-                        }}
-                    }} else {{
-                        console.log("No opener found");
-                        document.getElementById('manual').style.display = 'block';
-                    }}
-                }}
-                
-                // Try immediately and then retry after a short delay
-                sendMessage();
-                setTimeout(sendMessage, 500);
-                
-                // Close window after 5 seconds regardless
-                setTimeout(() => {{
-                    window.close();
-                }}, 5000);
-            </script>
-        </head>
-        <body>
-            <div class="success">✅ Authentication Successful!</div>
-            <p>Welcome, {user_info.get("first_name", "")} {user_info.get("last_name", "")}!</p>
-            <p>User ID: {user_id}</p>
-            <p>This window will close automatically...</p>
-            
-            <div id="manual" style="display: none; margin-top: 20px;">
-                <p>If the window doesn't close automatically:</p>
-                <button onclick="window.close()">Close Window</button>
-                <p>Or return to the app:</p>
-                <a href="{FRONTEND_URL}?zoom_user_id={user_id}" target="_top">Return to App</a>
-            </div>
-        </body>
-        </html>
-        """
-        from fastapi.responses import HTMLResponse
-        return HTMLResponse(content=success_html)
-        
-    except Exception as e:
-        logger.error(f"OAuth callback exception: {str(e)}")
-       # Find this section around line 449
-# Fixed version - create the error string first, then use it in the f-string
-        # Fixed version - create the error string first, then use it in the f-string
-        error_str = str(e).replace("'", "\\'")
-        error_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Authentication Failed</title>
-            <script>
-                if (window.opener) {{
-                    window.opener.postMessage({{
-                        type: 'ZOOM_AUTH_ERROR',
-                        error: '{error_str}' 
-                    }}, '*');
-                    setTimeout(() => window.close(), 1000);
-                }} else {{
-                    window.location.href = "{FRONTEND_URL}?error={error_str}";
-                }}
-            </script>
-        </head>
-        <body>
-            <h3>Authentication failed: {error_str}</h3>
-            <p>This window will close automatically...</p>
-        </body>
-        </html>
-        """
-        from fastapi.responses import HTMLResponse
-        return HTMLResponse(content=error_html)
+        self.store[info["job_id"]] = info
+        self.failed += 1
+        logger.warning(f"Job {info['job_id']} ({info['kind']}) was orphaned and marked failed")
+        return info
     
-@app.get("/recordings")
-async def get_recordings(user_id: str, from_date: Optional[str] = None, 
-                        to_date: Optional[str] = None):
-    """Get user recordings"""
+    def result(self, job_id: str):
+        return self.store.get(f"{job_id}/result")
+    
+    def cancel(self, job_id: str):
+        """Cancel a job here, or ask the worker running it to"""
+        if not self._cancel_local(job_id):
+            self.coordinator.publish("job_cancel", job_id)
+    
+    def _cancel_local(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        if job.status == "queued":
+            # Skipped by the worker that dequeues it
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            self.cancelled += 1
+            self._save(job)
+            self._notify(job)
+        elif job.task is not None:
+            job.task.cancel()
+        return True
+    
+    def list(self, kind: Optional[str] = None) -> list:
+        """Known jobs, newest first"""
+        jobs = [self.get(job_id) for job_id in list(self.store) if "/" not in job_id]
+        jobs = [job for job in jobs if job is not None and (kind is None or job["kind"] == kind)]
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+    
+    def _forget(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        self.store.pop(job_id, None)
+        self.store.pop(f"{job_id}/result", None)
+    
+    def sweep(self, orphan_after: Optional[float] = None):
+        """Fail orphaned jobs and drop finished jobs past their result TTL"""
+        if orphan_after is None:
+            orphan_after = self.config["orphan_after"]
+        now = time.time()
+        for job_id in list(self.store):
+            info = self.store.get(job_id) if "/" not in job_id else None
+            if info is not None:
+                info = self._reclaim(info, orphan_after)
+            if info is not None and info["expires_at"] is not None and info["expires_at"] <= now:
+                self._forget(job_id)
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job_id not in self.store:
+                self._jobs.pop(job_id, None)
+    
+    async def _sweep_periodically(self):
+        while True:
+            await asyncio.sleep(self.config["sweep_interval"])
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Job sweep failed: {e}")
+    
+    async def _heartbeat_periodically(self):
+        while True:
+            await asyncio.sleep(self.config["heartbeat_interval"])
+            for job in list(self._jobs.values()):
+                if job.status not in Job.TERMINAL:
+                    self._save(job)
+    
+    async def stream(self, job_id: str):
+        """Yield status snapshots until the job finishes"""
+        last = None
+        while True:
+            job = self._jobs.get(job_id)
+            changed = job.changed if job is not None else None
+            info = self.get(job_id)
+            if info is None:
+                return
+            if info != last:
+                yield info
+                last = info
+            elif changed is None:
+                await asyncio.sleep(self.config["stream_poll"])
+                continue
+            if info["status"] in Job.TERMINAL:
+                return
+            if changed is not None:
+                # Not wait_event: its timeout would leave the shared event set
+                waiter = asyncio.ensure_future(changed.wait())
+                try:
+                    done, _ = await asyncio.wait({waiter}, timeout=self.config["stream_heartbeat"])
+                finally:
+                    waiter.cancel()
+                if not done:
+                    last = None  # Heartbeat: repeat the snapshot
+            else:
+                await asyncio.sleep(self.config["stream_poll"])
+    
+    def start(self):
+        """Start the worker pool"""
+        if not self._tasks:
+            # A lone worker owns nothing it finds unfinished in the store
+            try:
+                self.sweep(0.0 if WORKER_CONFIG["workers"] == 1 else None)
+            except Exception as e:
+                logger.error(f"Job sweep failed: {e}")
+            self._tasks = [
+                asyncio.create_task(self._worker()) for _ in range(self.config["concurrency"])
+            ]
+            self._tasks.append(asyncio.create_task(self._sweep_periodically()))
+            self._tasks.append(asyncio.create_task(self._heartbeat_periodically()))
+    
+    async def stop(self):
+        """Cancel running jobs and the worker pool"""
+        for job in list(self._jobs.values()):
+            if job.status == "queued":
+                self._cancel_local(job.id)
+            elif job.task is not None:
+                job.task.cancel()
+        running = [job.task for job in self._jobs.values() if job.task is not None]
+        await asyncio.gather(*running, return_exceptions=True)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.store.close()
+    
+    def stats(self) -> dict:
+        return {
+            "workers": self.config["concurrency"] if self._tasks else 0,
+            "queued": self._queue.qsize(),
+            "running": sum(1 for job in self._jobs.values() if job.status == "running"),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+        }
+
+# Initialize background jobs
+job_queue = JobQueue(JOB_CONFIG, create_token_store("jobs"), worker_coordinator)
+
+class RecordingsHistoryRequest(BaseModel):
+    user_id: str
+    from_date: Optional[str] = None
+    to_date: Optional[str] = None
+
+@job_queue.register("recordings_history")
+async def recordings_history_job(job: Job, params: dict) -> dict:
+    """Every recording in a (possibly years long) range for one user"""
+    user_id = params["user_id"]
     if user_id not in user_tokens:
+        raise HTTPException(status_code=401, detail="User not authenticated")
+    windows = split_date_range(params["from_date"], params["to_date"], RECORDINGS_CONFIG["window_days"])
+    job_queue.report(job, windows_total=len(windows), windows_done=0, meetings=0)
+    
+    semaphore = asyncio.Semaphore(RECORDINGS_CONFIG["fanout_concurrency"])
+    
+    async def fetch_window(window):
+        async with semaphore:
+            return await call_with_token_refresh(
+                user_id,
+                lambda access_token: zoom_api.get_user_recordings_range(
+                    access_token, user_id, [window], use_cache=False
+                )
+            )
+    
+    tasks = [asyncio.create_task(fetch_window(window)) for window in windows]
+    pages = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            pages.append((await next_done)["meetings"])
+            job_queue.report(
+                job, windows_done=len(pages), meetings=job.progress["meetings"] + len(pages[-1])
+            )
+    finally:
+        for task in tasks:
+            task.cancel()
+    
+    meetings = merge_meetings(pages)
+    return {
+        "user_id": user_id,
+        "from": windows[0][0],
+        "to": windows[-1][1],
+        "total_records": len(meetings),
+        "meetings": meetings,
+    }
+
+@job_queue.register("recordings_export")
+async def recordings_export_job(job: Job, params: dict) -> dict:
+    """Recordings for many users; per-user failures are reported, not raised"""
+    user_ids = params["user_ids"]
+    job_queue.report(job, users_total=len(user_ids), users_done=0, users_failed=0)
+    semaphore = asyncio.Semaphore(BATCH_CONFIG["concurrency"])
+    tasks = [
+        asyncio.create_task(_batch_user_recordings(
+            user_id, params["from_date"], params["to_date"], semaphore
+        ))
+        for user_id in user_ids
+    ]
+    users = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            users.append(await next_done)
+            job_queue.report(
+                job, users_done=len(users),
+                users_failed=sum(1 for user in users if user["status_code"] != 200)
+            )
+    finally:
+        for task in tasks:
+            task.cancel()
+    return {"users": users}
+
+@job_queue.register("archive")
+async def archive_job(job: Job, params: dict) -> dict:
+    """Archive users' recordings to disk, reporting archiver progress"""
+    archive = ArchiveJob(job.id, params["user_ids"], params["from_date"], params["to_date"])
+    task = asyncio.create_task(recording_archiver.run(archive))
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=JOB_CONFIG["progress_interval"])
+            job_queue.report(job, **archive.progress())
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    if archive.status == "failed":
+        raise RuntimeError(archive.errors[-1] if archive.errors else "Archive failed")
+    return archive.progress()
+
+@app.post("/jobs/recordings-history", status_code=202)
+async def submit_recordings_history(history: RecordingsHistoryRequest):
+    """Fetch a user's full recording history in the background"""
+    if history.user_id not in user_tokens:
         raise HTTPException(
             status_code=401, 
             detail="User not authenticated. Please visit /oauth/login first."
         )
-    
-    token_info = user_tokens[user_id]
-    access_token = token_info["access_token"]
-    
-    try:
-        recordings = await zoom_api.get_user_recordings(
-            access_token, user_id, from_date, to_date
+    from_date = history.from_date or (
+        date.today() - timedelta(days=RECORDINGS_INDEX_CONFIG["initial_days"])
+    ).isoformat()
+    to_date = history.to_date or date.today().isoformat()
+    # Reject a bad date range before the job is queued
+    split_date_range(from_date, to_date, RECORDINGS_CONFIG["window_days"])
+    job = job_queue.submit("recordings_history", {
+        "user_id": history.user_id, "from_date": from_date, "to_date": to_date
+    })
+    return job.to_dict()
+
+@app.post("/jobs/recordings-export", status_code=202)
+async def submit_recordings_export(batch: BatchRecordingsRequest):
+    """Export many users' recordings in the background (see /recordings/batch)"""
+    user_ids = list(dict.fromkeys(batch.user_ids))
+    if len(user_ids) > BATCH_CONFIG["max_users"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BATCH_CONFIG['max_users']} users per batch"
         )
-        return recordings
-        
-    except HTTPException as e:
-        if e.status_code == 401:
-            # Try to refresh token
-            try:
-                refresh_token = token_info["refresh_token"]
-                new_token_data = await zoom_oauth.refresh_token(refresh_token)
-                
-                # Update stored tokens
-                user_tokens[user_id].update({
-                    "access_token": new_token_data["access_token"],
-                    "refresh_token": new_token_data.get("refresh_token", refresh_token),
-                    "expires_in": new_token_data["expires_in"]
-                })
-                
-                # Retry the request with new token
-                recordings = await zoom_api.get_user_recordings(
-                    new_token_data["access_token"], user_id, from_date, to_date
-                )
-                return recordings
-                
-            except Exception as refresh_error:
-                raise HTTPException(
-                    status_code=401, 
-                    detail="Token expired and refresh failed. Please re-authenticate."
-                )
-        else:
-            raise e
+    recording_windows(batch.from_date, batch.to_date)
+    job = job_queue.submit("recordings_export", {
+        "user_ids": user_ids, "from_date": batch.from_date, "to_date": batch.to_date
+    })
+    return job.to_dict()
+
+@app.get("/jobs")
+async def list_jobs(kind: Optional[str] = None):
+    """Recent background jobs, newest first"""
+    return {"jobs": job_queue.list(kind)}
+
+def _get_job_or_404(job_id: str) -> dict:
+    info = job_queue.get(job_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return info
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status and progress of a background job"""
+    return _get_job_or_404(job_id)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str):
+    """Stream status snapshots as NDJSON until the job finishes"""
+    _get_job_or_404(job_id)
+    return StreamingResponse(ndjson_lines(job_queue.stream(job_id)), media_type="application/x-ndjson")
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(request: Request, job_id: str, fields: Optional[str] = None):
+    """Result of a completed job (fields projects meetings like /recordings, where it has them)"""
+    info = _get_job_or_404(job_id)
+    if info["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {info['status']}")
+    result = job_queue.result(job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Job result expired")
+    if isinstance(result, dict) and "meetings" in result:
+        result = project_meetings(result, parse_fields(fields))
+    return conditional_json(request, result, RECORDINGS_CACHE_CONTROL)
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    info = _get_job_or_404(job_id)
+    if info["status"] in Job.TERMINAL:
+        raise HTTPException(status_code=409, detail=f"Job is already {info['status']}")
+    job_queue.cancel(job_id)
+    return {"message": "Cancellation requested", "job_id": job_id}
+
+class ArchiveRequest(BaseModel):
+    user_ids: List[str]
+    from_date: Optional[str] = None
+    to_date: Optional[str] = None
+
+def archive_progress(info: dict) -> dict:
+    """Archive job status in the flat shape /archive has always returned"""
+    progress = {
+        "job_id": info["job_id"],
+        "status": "pending" if info["status"] == "queued" else info["status"],
+        "user_ids": info["params"]["user_ids"],
+        "from_date": info["params"]["from_date"],
+        "to_date": info["params"]["to_date"],
+    }
+    # The archiver's own status (e.g. completed_with_errors) wins once it reports
+    progress.update(info["progress"])
+    if info["error"] and info["status"] == "failed":
+        progress.setdefault("errors", [info["error"]])
+    return progress
+
+@app.post("/archive")
+async def start_archive(archive: ArchiveRequest):
+    """Start archiving users' recordings to local disk"""
+    # Reject a bad date range before the job starts
+    recording_windows(archive.from_date, archive.to_date)
+    job = job_queue.submit("archive", {
+        "user_ids": list(dict.fromkeys(archive.user_ids)),
+        "from_date": archive.from_date, "to_date": archive.to_date,
+    })
+    return archive_progress(job.to_dict())
+
+@app.get("/archive")
+async def list_archives():
+    """Progress of recent archive jobs"""
+    return {"jobs": [archive_progress(info) for info in job_queue.list("archive")]}
+
+@app.get("/archive/{job_id}")
+async def get_archive(job_id: str):
+    """Progress and throughput of one archive job"""
+    info = job_queue.get(job_id)
+    if info is None or info["kind"] != "archive":
+        raise HTTPException(status_code=404, detail="Archive job not found")
+    return archive_progress(info)
 
 @app.get("/user/{user_id}")
-async def get_user_info(user_id: str):
-    """Get user information"""
+async def get_user_info(request: Request, user_id: str, live: bool = False):
+    """Get user information (live=true re-reads it from Zoom through the cache)"""
     if user_id not in user_tokens:
         raise HTTPException(
             status_code=401, 
             detail="User not authenticated. Please visit /oauth/login first."
         )
     
+    if live:
+        user_info = await call_with_token_refresh(
+            user_id,
+            lambda access_token: zoom_api.get_user_info(access_token, user_id)
+        )
+        user_tokens[user_id] = {**user_tokens[user_id], "user_info": user_info}
+    
     token_info = user_tokens[user_id]
-    return {
+    return conditional_json(request, {
         "user_info": token_info["user_info"],
         "authenticated": True
-    }
+    }, USER_INFO_CACHE_CONTROL)
 
 @app.delete("/oauth/logout/{user_id}")
 async def logout(user_id: str):
     """Logout user (remove stored tokens)"""
     if user_id in user_tokens:
         del user_tokens[user_id]
+        await user_tokens.flush()
+        response_cache.invalidate_user(user_id)
+        token_refresher.unschedule(user_id)
+        await recordings_index.delete(user_id)
         return {"message": "User logged out successfully"}
     else:
         raise HTTPException(status_code=404, detail="User not found")
@@ -540,6 +4153,149 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "zoom-recordings-api"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: startup finished and the token store answers (/health is liveness only)"""
+    checks = {"startup": startup.ready}
+    try:
+        await asyncio.to_thread(user_tokens.ping)
+        checks["token_store"] = True
+    except Exception as e:
+        logger.warning(f"Readiness check: token store unavailable: {e}")
+        checks["token_store"] = False
+    
+    ready = all(checks.values())
+    return FastJSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks}
+    )
+
+@app.get("/debug/http-pool")
+async def debug_http_pool():
+    """Shared HTTP connection pool statistics"""
+    return http_pool.stats()
+
+@app.get("/debug/cache")
+async def debug_cache():
+    """Response cache statistics"""
+    return response_cache.stats()
+
+@app.get("/debug/singleflight")
+async def debug_singleflight():
+    """Request coalescing statistics"""
+    return {
+        "zoom_api": zoom_api.flights.stats(),
+        "token_refresh": token_refresh_flights.stats(),
+    }
+
+@app.get("/debug/token-refresh")
+async def debug_token_refresh():
+    """Proactive token refresh scheduler statistics"""
+    return token_refresher.stats()
+
+@app.get("/debug/oauth-states")
+async def debug_oauth_states():
+    """OAuth state store statistics"""
+    return oauth_states.stats()
+
+@app.get("/debug/rate-limits")
+async def debug_rate_limits():
+    """Outbound rate-limit scheduler statistics"""
+    return outbound_scheduler.stats()
+
+@app.post("/recordings/sync/{user_id}")
+async def sync_recordings(user_id: str):
+    """Sync a user's recordings index now"""
+    if user_id not in user_tokens:
+        raise HTTPException(
+            status_code=401, 
+            detail="User not authenticated. Please visit /oauth/login first."
+        )
+    return await recordings_syncer.sync_user(user_id)
+
+@app.get("/debug/recordings-index")
+async def debug_recordings_index():
+    """Recordings index sync statistics"""
+    return recordings_syncer.stats()
+
+@app.get("/debug/webhooks")
+async def debug_webhooks():
+    """Webhook ingestion statistics"""
+    return webhook_consumer.stats()
+
+def _register_state_metrics():
+    """Scrape-time gauges over stores, caches and pools"""
+    metrics.register(CallbackMetric(
+        "zoom_user_tokens", "Authenticated users in the token store", lambda: len(user_tokens)
+    ))
+    metrics.register(CallbackMetric(
+        "zoom_oauth_states_outstanding", "OAuth states awaiting a callback", lambda: len(oauth_states)
+    ))
+    metrics.register(CallbackMetric(
+        "zoom_response_cache_events_total", "Response cache lookups and evictions",
+        lambda: {
+            (event,): response_cache.stats()[event]
+            for event in ("hits", "stale_hits", "misses", "evictions", "invalidations")
+        },
+        labels=("event",), type="counter"
+    ))
+    metrics.register(CallbackMetric(
+        "zoom_response_cache_entries", "Entries in the response cache", lambda: len(response_cache._entries)
+    ))
+    metrics.register(CallbackMetric(
+        "http_pool_connections", "Outbound HTTP pool connections and requests",
+        lambda: {
+            (state,): http_pool.stats()[key]
+            for state, key in (
+                ("open", "connections_open"), ("idle", "connections_idle"),
+                ("active_requests", "requests_active"), ("waiting_requests", "requests_waiting"),
+            )
+        },
+        labels=("state",)
+    ))
+    metrics.register(CallbackMetric(
+        "zoom_outbound_waiting", "Requests waiting on Zoom rate limits",
+        lambda: {
+            ("interactive",): outbound_scheduler.stats()["waiting_interactive"],
+            ("background",): outbound_scheduler.stats()["waiting_background"],
+        },
+        labels=("priority",)
+    ))
+
+    metrics.register(CallbackMetric(
+        "app_startup_seconds", "Cold start cost by phase (first_request is time to its response)",
+        lambda: {
+            (phase,): seconds for phase, seconds in (
+                ("import", startup.import_seconds),
+                ("lifespan", startup.lifespan_seconds),
+                ("first_request", (startup.first_request or {}).get("response_seconds")),
+            ) if seconds is not None
+        },
+        labels=("phase",)
+    ))
+
+_register_state_metrics()
+
+@app.get("/debug/startup")
+async def debug_startup():
+    """Import time, time to first request and per-component start costs"""
+    return startup.stats()
+
+@app.get("/debug/jobs")
+async def debug_jobs():
+    """Background job queue counters"""
+    return job_queue.stats()
+
+@app.get("/debug/workers")
+async def debug_workers():
+    """Cross-worker invalidation and lease counters for this worker"""
+    return {"pid": os.getpid(), **worker_coordinator.stats()}
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/debug/config")
 async def debug_config():
     """Debug configuration endpoint"""
@@ -547,10 +4303,27 @@ async def debug_config():
         "client_id": ZOOM_CONFIG["client_id"],
         "redirect_uri": ZOOM_CONFIG["redirect_uri"],
         "base_url": ZOOM_CONFIG["base_url"],
-        "auth_url": "https://zoom.us/oauth/authorize",
-        "token_url": "https://zoom.us/oauth/token"
+        "auth_url": ZOOM_CONFIG["auth_url"],
+        "token_url": ZOOM_CONFIG["token_url"]
     }
 
+startup.imported()
+
 if __name__ == "__main__":
+    import argparse
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Zoom Recordings API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=WORKER_CONFIG["workers"],
+                        help="worker processes; more than one shares state through SQLite")
+    args = parser.parse_args()
+    
+    if args.workers > 1:
+        # Workers import the app afresh and read their settings from the environment
+        if os.environ.setdefault("TOKEN_STORE_BACKEND", "sqlite") != "sqlite":
+            parser.error("--workers needs TOKEN_STORE_BACKEND=sqlite so workers share logins")
+        os.environ["ZOOM_WORKERS"] = str(args.workers)
+        uvicorn.run("zoom:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
\ No newline at end of file